@@ -1,5 +1,7 @@
+import io
 import chess
 import chess.engine
+import chess.pgn
 import chess.svg
 import logging
 import urllib.parse
@@ -503,9 +505,6 @@ class ChessAnalyzer:
                 metadata: Game metadata dict.
                 move_evals: Per-half-move eval list for chart/PGN annotation.
         """
-        import io
-        import chess.pgn
-
         game = chess.pgn.read_game(io.StringIO(pgn_text))
         if not game:
             logger.error("Could not parse PGN.")
@@ -2,13 +2,69 @@ import os
 import re
 import json
 import html
+import io
 import logging
-from typing import List, Dict, Optional, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Any, Tuple
 from chess_tools.lib.models import CrucialMoment
 from chess_tools.analysis.engine import TACTIC_LABELS, TACTIC_COLORS, MOMENT_TYPE_LABELS, SEVERITY_COLORS, MATE_SCORE_CP
 
 logger = logging.getLogger("chess_transfer")
 
+_MISSED_TYPES = frozenset({"missed_chance", "missed_mate"})
+
+_REPORT_META_RE = re.compile(rb'<meta\s+name="report-data"\s+content=\'([^\']+)\'')
+
+# \w is str.isalnum() plus underscore, so this keeps non-ASCII letters in names
+_UNSAFE_NAME_RE = re.compile(r'[^\w ]')
+
+
+def _fast_escape(text: str) -> str:
+    """
+    html.escape that returns text untouched when it has nothing to escape.
+
+    SAN moves, FENs and engine lines almost never contain markup characters,
+    and five substring probes are about twice as fast as html.escape's
+    replace chain on such strings.
+    """
+    if '&' in text or '<' in text or '>' in text or '"' in text or "'" in text:
+        return html.escape(text)
+    return text
+
+
+def _safe_name(name: str) -> str:
+    """Strips a player name down to filename-safe characters, spaces -> underscores."""
+    return _UNSAFE_NAME_RE.sub('', name).replace(' ', '_')
+
+
+def _single_quoted_attr(value: str) -> str:
+    """
+    Escapes a value for a single-quoted HTML attribute.
+
+    Only & and ' can terminate or corrupt such an attribute, so JSON's double
+    quotes are left as-is instead of being expanded to &quot;.
+    """
+    return value.replace('&', '&amp;').replace("'", '&#39;')
+
+
+def _tactic_label(tactic_type: str, missed: bool = False) -> str:
+    """Display label for a tactic type, prefixed with "Missed" for missed chances."""
+    label = TACTIC_LABELS.get(tactic_type, tactic_type)
+    return f"Missed {label}" if missed else label
+
+
+def _count_moments(moments: List[CrucialMoment]) -> Tuple[int, int]:
+    """Returns (blunder_count, missed_count) in a single pass over moments."""
+    blunders = missed = 0
+    for moment in moments:
+        moment_type = moment.moment_type
+        if moment_type == "blunder":
+            blunders += 1
+        elif moment_type in _MISSED_TYPES:
+            missed += 1
+    return blunders, missed
+
+
 def generate_markdown_report(moments: List[CrucialMoment], metadata: Dict[str, str], output_dir: str = "analysis", summary: str = None):
     """
     Generates a Markdown report from the analyzed moments.
@@ -19,18 +75,16 @@ def generate_markdown_report(moments: List[CrucialMoment], metadata: Dict[str, s
         output_dir (str): Directory to save the report and images.
         summary (str, optional): The LLM generated summary of the game.
     """
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-    
+    os.makedirs(output_dir, exist_ok=True)
+
     # Create images subdirectory
     images_dir = os.path.join(output_dir, "images")
-    if not os.path.exists(images_dir):
-        os.makedirs(images_dir)
+    os.makedirs(images_dir, exist_ok=True)
 
     # Create filename: Date_White_vs_Black.md
     safe_date = metadata['Date'].replace('.', '-')
-    safe_white = "".join(c for c in metadata['White'] if c.isalnum() or c in (' ', '_')).replace(' ', '_')
-    safe_black = "".join(c for c in metadata['Black'] if c.isalnum() or c in (' ', '_')).replace(' ', '_')
+    safe_white = _safe_name(metadata['White'])
+    safe_black = _safe_name(metadata['Black'])
     filename = f"{safe_date}_{safe_white}_vs_{safe_black}.md"
     output_path = os.path.join(output_dir, filename)
 
@@ -43,8 +97,7 @@ def generate_markdown_report(moments: List[CrucialMoment], metadata: Dict[str, s
             logger.info(f"Report generated (empty): {output_path}")
             return
 
-        blunder_count = sum(1 for m in moments if m.moment_type == "blunder")
-        missed_count = sum(1 for m in moments if m.moment_type in ("missed_chance", "missed_mate"))
+        blunder_count, missed_count = _count_moments(moments)
         f.write(f"Found **{len(moments)}** crucial moments")
         if missed_count:
             f.write(f" ({blunder_count} blunder{'s' if blunder_count != 1 else ''}, {missed_count} missed opportunity{'s' if missed_count != 1 else ''})")
@@ -56,18 +109,19 @@ def generate_markdown_report(moments: List[CrucialMoment], metadata: Dict[str, s
             image_path = os.path.join(images_dir, image_filename)
 
             if moment.svg_content:
-                with open(image_path, "w") as img_file:
-                    img_file.write(moment.svg_content)
+                # Binary write of pre-encoded bytes: no text-layer wrapper, and
+                # UTF-8 regardless of the platform's default encoding
+                svg_bytes = moment.svg_content.encode("utf-8")
+                with open(image_path, "wb") as img_file:
+                    img_file.write(svg_bytes)
 
             # Relative path for Markdown
             relative_image_path = f"images/{image_filename}"
 
             type_label = MOMENT_TYPE_LABELS.get(moment.moment_type, "Blunder")
             severity_label = moment.severity.upper()
-            tactic_label = TACTIC_LABELS.get(moment.tactic_type, moment.tactic_type)
-            is_missed = moment.moment_type in ("missed_chance", "missed_mate")
-            if is_missed:
-                tactic_label = f"Missed {tactic_label}"
+            is_missed = moment.moment_type in _MISSED_TYPES
+            tactic_label = _tactic_label(moment.tactic_type, is_missed)
 
             f.write(f"## Moment {i} — {type_label} [{severity_label}]\n\n")
             f.write(f"**Tactic:** {tactic_label}\n\n")
@@ -102,23 +156,32 @@ def generate_markdown_report(moments: List[CrucialMoment], metadata: Dict[str, s
     logger.info(f"Report generated: {output_path}")
 
 
+_MD_BOLD_RE = re.compile(r'\*\*(.+?)\*\*')
+_MD_ITALIC_RE = re.compile(r'\*(.+?)\*')
+_MD_LIST_ITEM_RE = re.compile(r'^[\-\*]\s+(.+)$', re.MULTILINE)
+_MD_LIST_RUN_RE = re.compile(r'((?:<li>.*?</li>\n?)+)')
+_MD_HEADING_RE = re.compile(r'^##\s+(.+)$', re.MULTILINE)
+# One fixed-width lookbehind: ul, h3 and li are all two characters
+_MD_NEWLINE_RE = re.compile(r'(?<!</(?:ul|h3|li)>)\n')
+
+
 def _md_to_html(text: str) -> str:
     """Lightweight markdown-to-HTML conversion for LLM summary text."""
     if not text:
         return ""
     escaped = html.escape(text)
     # Bold: **text** -> <strong>text</strong>
-    escaped = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', escaped)
+    escaped = _MD_BOLD_RE.sub(r'<strong>\1</strong>', escaped)
     # Italic: *text* -> <em>text</em>
-    escaped = re.sub(r'\*(.+?)\*', r'<em>\1</em>', escaped)
+    escaped = _MD_ITALIC_RE.sub(r'<em>\1</em>', escaped)
     # List items: lines starting with - or *
-    escaped = re.sub(r'^[\-\*]\s+(.+)$', r'<li>\1</li>', escaped, flags=re.MULTILINE)
+    escaped = _MD_LIST_ITEM_RE.sub(r'<li>\1</li>', escaped)
     # Wrap consecutive <li> in <ul>
-    escaped = re.sub(r'((?:<li>.*?</li>\n?)+)', r'<ul>\1</ul>', escaped)
+    escaped = _MD_LIST_RUN_RE.sub(r'<ul>\1</ul>', escaped)
     # Headings: ## text -> <h3>
-    escaped = re.sub(r'^##\s+(.+)$', r'<h3>\1</h3>', escaped, flags=re.MULTILINE)
+    escaped = _MD_HEADING_RE.sub(r'<h3>\1</h3>', escaped)
     # Newlines -> <br> (but not after block elements)
-    escaped = re.sub(r'(?<!</ul>)(?<!</h3>)(?<!</li>)\n', '<br>\n', escaped)
+    escaped = _MD_NEWLINE_RE.sub('<br>\n', escaped)
     return escaped
 
 
@@ -140,7 +203,7 @@ def format_refutation_line(line: str, hero_is_next_to_move: bool) -> str:
     for i, move in enumerate(moves):
         is_hero = (i % 2 == 0) == hero_is_next_to_move
         cls = "hero-move" if is_hero else "opp-move"
-        parts.append(f'<span class="{cls}">{html.escape(move)}</span>')
+        parts.append(f'<span class="{cls}">{_fast_escape(move)}</span>')
     return " ".join(parts)
 
 
@@ -316,6 +379,135 @@ _HTML_STYLE = """
     .token-link:hover { color: var(--text-color); }
 """
 
+_STYLESHEET_FILENAME = "style.css"
+
+# Constant page fragments, built once at import
+_HTML_HEAD_OPEN = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+"""
+
+_HTML_FOOTER = """</div>
+</body>
+</html>
+"""
+
+_INDEX_PAGE_PROLOGUE = f"""    <title>Analysis Reports</title>
+    <link rel="stylesheet" href="{_STYLESHEET_FILENAME}">
+</head>
+<body>
+<div class="container">
+    <h1>Analysis Reports</h1>
+    <div class="meta">Game analysis with Stockfish engine and AI coach explanations.</div>
+    <div class="run-bar">
+        <button class="run-btn" id="runBtn" onclick="triggerAnalysis()">&#9654; Run Analysis</button>
+        <span class="run-status" id="runStatus"></span>
+        <span class="token-link" id="tokenLink" onclick="resetToken()" title="Update stored GitHub token" style="display:none">[change token]</span>
+    </div>
+    <script>
+    (function() {{
+        var tokenLink = document.getElementById('tokenLink');
+        if (localStorage.getItem('gh_actions_pat')) tokenLink.style.display = '';
+    }})();
+
+    function triggerAnalysis() {{
+        var pat = localStorage.getItem('gh_actions_pat');
+        if (!pat) {{
+            pat = prompt('Enter a GitHub fine-grained PAT with Actions: write scope for e-riveras/chess-tools:');
+            if (!pat) return;
+            localStorage.setItem('gh_actions_pat', pat.trim());
+            document.getElementById('tokenLink').style.display = '';
+        }}
+        var btn = document.getElementById('runBtn');
+        var status = document.getElementById('runStatus');
+        btn.disabled = true;
+        btn.textContent = '⏳ Triggering…';
+        status.className = 'run-status';
+        status.textContent = '';
+        fetch('https://api.github.com/repos/e-riveras/chess-tools/actions/workflows/sync.yml/dispatches', {{
+            method: 'POST',
+            headers: {{
+                'Authorization': 'Bearer ' + localStorage.getItem('gh_actions_pat'),
+                'Accept': 'application/vnd.github+json',
+                'Content-Type': 'application/json'
+            }},
+            body: JSON.stringify({{ ref: 'main' }})
+        }}).then(function(r) {{
+            btn.disabled = false;
+            btn.innerHTML = '&#9654; Run Analysis';
+            if (r.status === 204) {{
+                status.className = 'run-status ok';
+                status.textContent = '✓ Workflow triggered — check Actions tab for progress.';
+            }} else if (r.status === 401 || r.status === 403) {{
+                status.className = 'run-status err';
+                status.textContent = '✗ Auth failed. Token may be invalid or lack Actions: write scope.';
+            }} else {{
+                status.className = 'run-status err';
+                status.textContent = '✗ Error ' + r.status + '. Check token permissions.';
+            }}
+        }}).catch(function(e) {{
+            btn.disabled = false;
+            btn.innerHTML = '&#9654; Run Analysis';
+            status.className = 'run-status err';
+            status.textContent = '✗ Network error: ' + e.message;
+        }});
+    }}
+
+    function resetToken() {{
+        localStorage.removeItem('gh_actions_pat');
+        document.getElementById('tokenLink').style.display = 'none';
+        document.getElementById('runStatus').textContent = '';
+        alert('Token cleared. You will be prompted on next run.');
+    }}
+    </script>
+"""
+
+
+def _ensure_stylesheet(output_dir: str):
+    """
+    Writes the shared report stylesheet into output_dir.
+
+    Reports and the index link to it instead of inlining _HTML_STYLE. The file
+    is only rewritten when missing or out of date with _HTML_STYLE.
+    """
+    path = os.path.join(output_dir, _STYLESHEET_FILENAME)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            if f.read() == _HTML_STYLE:
+                return
+    except OSError:
+        pass
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(_HTML_STYLE)
+
+
+
+_NO_ANNOTATION = ("", "")
+
+
+def _moment_pgn_annotation(m: CrucialMoment) -> Tuple[str, str]:
+    """Returns the (NAG, comment suffix) pair used to annotate a moment's move in PGN."""
+    moment_type = m.moment_type
+    if moment_type == "blunder":
+        moment_comment = f" {_tactic_label(m.tactic_type)}"
+        if m.refutation_line:
+            moment_comment += f" · {m.refutation_line.split()[0]}"
+        return " $4", moment_comment
+    if moment_type == "missed_mate":
+        nag = " $4"
+        moment_comment = f" Missed Mate in {m.mate_in or '?'}"
+    elif moment_type == "missed_chance":
+        nag = " $6"
+        moment_comment = f" {_tactic_label(m.tactic_type, missed=True)}"
+    else:
+        return _NO_ANNOTATION
+    best = m.best_move_san
+    if best and best != "N/A":
+        moment_comment += f" · best: {best}"
+    return nag, moment_comment
+
 
 def generate_annotated_pgn(metadata: Dict[str, str],
                            move_evals: List[Dict[str, Any]],
@@ -334,24 +526,25 @@ def generate_annotated_pgn(metadata: Dict[str, str],
     if not move_evals:
         return ""
 
-    # Build moment lookup by half_move
-    moment_by_hm: Dict[int, CrucialMoment] = {}
+    # Build (nag, comment) annotations by half_move
+    annotations: Dict[int, Tuple[str, str]] = {}
     for entry in move_evals:
         if "moment_index" in entry:
-            moment_by_hm[entry["half_move"]] = moments[entry["moment_index"]]
+            annotations[entry["half_move"]] = _moment_pgn_annotation(moments[entry["moment_index"]])
 
-    lines = []
+    buf = io.StringIO()
     # Headers
     for tag in ["Event", "Site", "Date", "White", "Black", "Result"]:
         val = metadata.get(tag, "?")
-        lines.append(f'[{tag} "{val}"]')
-    lines.append("")
+        buf.write(f'[{tag} "{val}"]\n')
+    buf.write("\n")
 
-    # Moves
-    move_parts = []
+    # Moves, wrapped at ~80 chars as they are emitted: a word goes on a new
+    # line when appending it (plus a separating space) would pass column 80.
+    result = metadata.get("Result", "*")
+    col = 0
     for entry in move_evals:
         hm = entry["half_move"]
-        san = entry["san"]
         is_white = entry["is_white"]
 
         # Move number prefix
@@ -362,57 +555,38 @@ def generate_annotated_pgn(metadata: Dict[str, str],
             prefix = ""
 
         # Eval comment
-        if entry["mate_in"] is not None:
-            mate_val = entry["mate_in"]
+        mate_val = entry["mate_in"]
+        if mate_val is not None:
             eval_str = f"#{mate_val}" if mate_val > 0 else f"#-{abs(mate_val)}"
         else:
             pawns = entry["eval_cp"] / 100
             eval_str = f"{pawns:+.2f}"
 
-        # Check for moment annotation
-        nag = ""
-        moment_comment = ""
-        m = moment_by_hm.get(hm)
-        if m:
-            tactic_label = TACTIC_LABELS.get(m.tactic_type, m.tactic_type)
-            if m.moment_type == "blunder":
-                nag = " $4"
-                ref_move = m.refutation_line.split()[0] if m.refutation_line else ""
-                moment_comment = f" {tactic_label}"
-                if ref_move:
-                    moment_comment += f" · {ref_move}"
-            elif m.moment_type == "missed_mate":
-                nag = " $4"
-                best = m.best_move_san if m.best_move_san != "N/A" else ""
-                moment_comment = f" Missed Mate in {m.mate_in or '?'}"
-                if best:
-                    moment_comment += f" · best: {best}"
-            elif m.moment_type == "missed_chance":
-                nag = " $6"
-                best = m.best_move_san if m.best_move_san != "N/A" else ""
-                moment_comment = f" Missed {tactic_label}"
-                if best:
-                    moment_comment += f" · best: {best}"
-
-        comment = f"{{{eval_str}{moment_comment}}}"
-        move_parts.append(f"{prefix}{san}{nag} {comment}")
-
-    # Wrap at ~80 chars
-    result = metadata.get("Result", "*")
-    move_text = " ".join(move_parts) + f" {result}"
-    wrapped = []
-    current_line = ""
-    for word in move_text.split(" "):
-        if len(current_line) + len(word) + 1 > 80 and current_line:
-            wrapped.append(current_line)
-            current_line = word
-        else:
-            current_line = f"{current_line} {word}" if current_line else word
-    if current_line:
-        wrapped.append(current_line)
+        nag, moment_comment = annotations.get(hm, _NO_ANNOTATION)
+        move_text = f"{prefix}{entry['san']}{nag} {{{eval_str}{moment_comment}}}"
 
-    lines.append("\n".join(wrapped))
-    return "\n".join(lines)
+        # Fast path: the whole move fits on the current line
+        if col and col + len(move_text) + 1 <= 80:
+            buf.write(" ")
+            buf.write(move_text)
+            col += len(move_text) + 1
+            continue
+        for word in move_text.split(" "):
+            if col and col + len(word) + 1 > 80:
+                buf.write("\n")
+                col = 0
+            elif col:
+                buf.write(" ")
+                col += 1
+            buf.write(word)
+            col += len(word)
+
+    if col and col + len(result) + 1 > 80:
+        buf.write("\n")
+    else:
+        buf.write(" ")
+    buf.write(result)
+    return buf.getvalue()
 
 
 def generate_eval_chart_svg(move_evals: List[Dict[str, Any]],
@@ -440,22 +614,22 @@ def generate_eval_chart_svg(move_evals: List[Dict[str, Any]],
     mid_y = margin_top + plot_h / 2
     max_pawns = 8.0
     n = len(move_evals)
-
-    def x_pos(i):
-        return margin_left + (i / max(n - 1, 1)) * plot_w
+    x_span = max(n - 1, 1)
+    half_h = plot_h / 2
 
     def y_pos(cp):
         pawns = max(-max_pawns, min(max_pawns, cp / 100))
-        return mid_y - (pawns / max_pawns) * (plot_h / 2)
-
-    # Build eval points
-    points = []
-    for i, entry in enumerate(move_evals):
-        if entry["mate_in"] is not None:
-            cp = MATE_SCORE_CP if entry["mate_in"] > 0 else -MATE_SCORE_CP
-        else:
-            cp = entry["eval_cp"]
-        points.append((x_pos(i), y_pos(cp), cp, entry))
+        return mid_y - (pawns / max_pawns) * half_h
+
+    # Build eval points as parallel lists indexed like move_evals — y_pos is inlined
+    # here since it runs per half-move; y_pos itself only serves the axis labels
+    cps = [
+        entry["eval_cp"] if entry["mate_in"] is None
+        else (MATE_SCORE_CP if entry["mate_in"] > 0 else -MATE_SCORE_CP)
+        for entry in move_evals
+    ]
+    xs = [margin_left + (i / x_span) * plot_w for i in range(n)]
+    ys = [mid_y - (max(-max_pawns, min(max_pawns, cp / 100)) / max_pawns) * half_h for cp in cps]
 
     parts = []
     parts.append(f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width} {height}" '
@@ -465,36 +639,26 @@ def generate_eval_chart_svg(move_evals: List[Dict[str, Any]],
     parts.append(f'<rect x="0" y="0" width="{width}" height="{height}" fill="#1a1a2e" rx="8"/>')
 
     # Fill regions — split the line at y=mid_y for White/Black advantage areas
-    # White advantage (above zero line) — light fill
-    line_coords = " ".join(f"{px},{py}" for px, py, _, _ in points)
-    # Closed polygon for above-zero fill
-    white_poly = f"M{margin_left},{mid_y} "
-    for px, py, cp, _ in points:
-        cy = min(py, mid_y)
-        white_poly += f"L{px},{cy} "
-    white_poly += f"L{points[-1][0]},{mid_y} Z"
-    parts.append(f'<path d="{white_poly}" fill="rgba(255,255,255,0.1)" />')
+    # White advantage (above zero line) — light fill, as a closed polygon
+    white_poly = "".join(f"L{px:.1f},{min(py, mid_y):.1f} " for px, py in zip(xs, ys))
+    parts.append(f'<path d="M{margin_left},{mid_y} {white_poly}L{xs[-1]:.1f},{mid_y} Z" fill="rgba(255,255,255,0.1)" />')
 
     # Black advantage (below zero line) — dark fill
-    black_poly = f"M{margin_left},{mid_y} "
-    for px, py, cp, _ in points:
-        cy = max(py, mid_y)
-        black_poly += f"L{px},{cy} "
-    black_poly += f"L{points[-1][0]},{mid_y} Z"
-    parts.append(f'<path d="{black_poly}" fill="rgba(50,50,50,0.6)" />')
+    black_poly = "".join(f"L{px:.1f},{max(py, mid_y):.1f} " for px, py in zip(xs, ys))
+    parts.append(f'<path d="M{margin_left},{mid_y} {black_poly}L{xs[-1]:.1f},{mid_y} Z" fill="rgba(50,50,50,0.6)" />')
 
     # Zero line
     parts.append(f'<line x1="{margin_left}" y1="{mid_y}" x2="{margin_left + plot_w}" y2="{mid_y}" '
                  f'stroke="#555" stroke-width="1" stroke-dasharray="4,4"/>')
 
     # Eval line
-    polyline = " ".join(f"{px},{py}" for px, py, _, _ in points)
+    polyline = " ".join(f"{px:.1f},{py:.1f}" for px, py in zip(xs, ys))
     parts.append(f'<polyline points="{polyline}" fill="none" stroke="#4a9eff" stroke-width="2"/>')
 
     # Y-axis labels
     for label_val in [-8, -4, 0, 4, 8]:
         ly = y_pos(label_val * 100)
-        parts.append(f'<text x="{margin_left - 5}" y="{ly + 4}" '
+        parts.append(f'<text x="{margin_left - 5}" y="{ly + 4:.1f}" '
                      f'text-anchor="end" fill="#888" font-size="11">'
                      f'{label_val:+d}</text>')
 
@@ -503,31 +667,68 @@ def generate_eval_chart_svg(move_evals: List[Dict[str, Any]],
         if entry["is_white"]:
             move_num = (entry["half_move"] + 1) // 2
             if move_num % 5 == 0 or move_num == 1:
-                lx = x_pos(i)
-                parts.append(f'<text x="{lx}" y="{height - 5}" '
+                parts.append(f'<text x="{xs[i]:.1f}" y="{height - 5}" '
                              f'text-anchor="middle" fill="#888" font-size="11">'
                              f'{move_num}</text>')
 
     # Critical moment markers
-    for px, py, cp, entry in points:
+    _esc = _fast_escape
+    for i, entry in enumerate(move_evals):
         mt = entry.get("moment_type")
+        if not mt:
+            continue
+        px, py, cp = xs[i], ys[i], cps[i]
         if mt == "blunder":
-            parts.append(f'<circle cx="{px}" cy="{py}" r="5" fill="#cc0000" stroke="#fff" stroke-width="1">'
-                         f'<title>{html.escape(entry["san"])} ({cp/100:+.1f}) Blunder</title></circle>')
-        elif mt in ("missed_chance", "missed_mate"):
-            parts.append(f'<circle cx="{px}" cy="{py}" r="5" fill="#d4ac0d" stroke="#fff" stroke-width="1">'
-                         f'<title>{html.escape(entry["san"])} ({cp/100:+.1f}) Missed</title></circle>')
+            parts.append(f'<circle cx="{px:.1f}" cy="{py:.1f}" r="5" fill="#cc0000" stroke="#fff" stroke-width="1">'
+                         f'<title>{_esc(entry["san"])} ({cp/100:+.1f}) Blunder</title></circle>')
+        elif mt in _MISSED_TYPES:
+            parts.append(f'<circle cx="{px:.1f}" cy="{py:.1f}" r="5" fill="#d4ac0d" stroke="#fff" stroke-width="1">'
+                         f'<title>{_esc(entry["san"])} ({cp/100:+.1f}) Missed</title></circle>')
 
     parts.append('</svg>')
     return "\n".join(parts)
 
 
+_EVAL_CHART_HEAD = (
+    '    <h2 style="margin-bottom:12px">Evaluation</h2>\n'
+    '    <div style="background:#2a2a3e;border-radius:8px;padding:16px;margin-bottom:24px;overflow-x:auto;">\n'
+)
+
+_PGN_BLOCK_HEAD = """    <h2 style="margin-top:24px;margin-bottom:12px">Annotated PGN</h2>
+    <p style="font-size:0.85rem;color:#666;margin-bottom:8px">Copy this PGN to paste into Lichess, ChessBase, or any analysis tool.</p>
+    <div style="
+        background:#1a1a2e;color:#e0e0e0;padding:16px 20px;border-radius:8px;
+        font-family:'SF Mono','Fira Code','Consolas',monospace;font-size:0.8rem;
+        line-height:1.6;white-space:pre-wrap;word-break:break-word;position:relative;
+        max-height:400px;overflow-y:auto;">
+        <button onclick="navigator.clipboard.writeText(this.nextElementSibling.textContent)"
+            style="position:absolute;top:8px;right:8px;background:#333;color:#ccc;
+            border:1px solid #555;padding:4px 12px;border-radius:4px;cursor:pointer;
+            font-size:0.75rem;">Copy</button>
+"""
+
+
+def _emit_eval_chart(parts: List[str], move_evals: List[Dict[str, Any]]):
+    """Appends the evaluation chart section of an HTML report to parts."""
+    chart_svg = generate_eval_chart_svg(move_evals)
+    if chart_svg:
+        parts.append(f'{_EVAL_CHART_HEAD}        {chart_svg}\n    </div>\n')
+
+
+def _emit_pgn_block(parts: List[str], metadata: Dict[str, str],
+                    move_evals: List[Dict[str, Any]], moments: List[CrucialMoment]):
+    """Appends the annotated-PGN section (with copy button) of an HTML report to parts."""
+    pgn_string = generate_annotated_pgn(metadata, move_evals, moments)
+    if pgn_string:
+        parts.append(f'{_PGN_BLOCK_HEAD}        <code id="annotated-pgn">{html.escape(pgn_string)}</code>\n    </div>\n')
+
+
 def generate_html_report(moments: List[CrucialMoment], metadata: Dict[str, str],
                          output_dir: str = "docs/analysis", summary: Optional[str] = None,
                          move_evals: Optional[List[Dict[str, Any]]] = None,
                          lichess_url: Optional[str] = None):
     """
-    Generates a self-contained HTML report with inline SVGs.
+    Generates an HTML report with inline SVGs, linked to the shared stylesheet.
 
     Args:
         moments: The list of analyzed moments.
@@ -537,12 +738,12 @@ def generate_html_report(moments: List[CrucialMoment], metadata: Dict[str, str],
         move_evals: Per-half-move eval list for chart/PGN annotation.
         lichess_url: Optional Lichess game URL for deep links.
     """
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    _ensure_stylesheet(output_dir)
 
     safe_date = metadata['Date'].replace('.', '-')
-    safe_white = "".join(c for c in metadata['White'] if c.isalnum() or c in (' ', '_')).replace(' ', '_')
-    safe_black = "".join(c for c in metadata['Black'] if c.isalnum() or c in (' ', '_')).replace(' ', '_')
+    safe_white = _safe_name(metadata['White'])
+    safe_black = _safe_name(metadata['Black'])
     filename = f"{safe_date}_{safe_white}_vs_{safe_black}.html"
     output_path = os.path.join(output_dir, filename)
 
@@ -552,7 +753,7 @@ def generate_html_report(moments: List[CrucialMoment], metadata: Dict[str, str],
         "black": metadata.get('Black', ''),
         "result": metadata.get('Result', ''),
         "moment_count": len(moments),
-    })
+    }, separators=(',', ':'))
 
     white_esc = html.escape(metadata.get('White', '?'))
     black_esc = html.escape(metadata.get('Black', '?'))
@@ -574,14 +775,10 @@ def generate_html_report(moments: List[CrucialMoment], metadata: Dict[str, str],
             f'Analyze on Lichess</a>\n'
         )
 
-    parts.append(f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <meta name="report-data" content='{html.escape(report_meta, quote=True)}'>
+    parts.append(_HTML_HEAD_OPEN)
+    parts.append(f"""    <meta name="report-data" content='{_single_quoted_attr(report_meta)}'>
     <title>Analysis: {white_esc} vs {black_esc}</title>
-    <style>{_HTML_STYLE}</style>
+    <link rel="stylesheet" href="{_STYLESHEET_FILENAME}">
 </head>
 <body>
 <div class="container">
@@ -590,14 +787,9 @@ def generate_html_report(moments: List[CrucialMoment], metadata: Dict[str, str],
     <div class="meta"><strong>Date:</strong> {date_esc} | <strong>Event:</strong> {event_esc} | <strong>Site:</strong> {site_esc}</div>
 {lichess_link_html}""")
 
-    # Eval chart (above moments)
+    # Eval chart (above moments) and annotated PGN (at the end) both come from move_evals
     if move_evals:
-        chart_svg = generate_eval_chart_svg(move_evals)
-        if chart_svg:
-            parts.append('    <h2 style="margin-bottom:12px">Evaluation</h2>\n')
-            parts.append('    <div style="background:#2a2a3e;border-radius:8px;padding:16px;margin-bottom:24px;overflow-x:auto;">\n')
-            parts.append(f'        {chart_svg}\n')
-            parts.append('    </div>\n')
+        _emit_eval_chart(parts, move_evals)
 
     if not moments:
         parts.append('    <p class="empty-msg">No crucial moments (blunders/missed wins) detected for the hero in this game.</p>\n')
@@ -608,100 +800,84 @@ def generate_html_report(moments: List[CrucialMoment], metadata: Dict[str, str],
                      '<span class="opp-move">Opponent moves</span>'
                      '</div>\n')
 
-        blunder_count = sum(1 for m in moments if m.moment_type == "blunder")
-        missed_count = sum(1 for m in moments if m.moment_type in ("missed_chance", "missed_mate"))
+        blunder_count, missed_count = _count_moments(moments)
         summary_text = f'Found <strong>{len(moments)}</strong> crucial moment{"s" if len(moments) != 1 else ""}'
         if missed_count:
             summary_text += f' ({blunder_count} blunder{"s" if blunder_count != 1 else ""}, {missed_count} missed opportunity{"s" if missed_count != 1 else ""})'
         parts.append(f'    <p class="summary-count">{summary_text}.</p>\n')
 
+        _esc = _fast_escape
         for i, moment in enumerate(moments, 1):
-            type_label = html.escape(MOMENT_TYPE_LABELS.get(moment.moment_type, "Blunder"))
-            severity_label = moment.severity.upper()
-            severity_color = SEVERITY_COLORS.get(moment.severity, "#7f8c8d")
-            tactic_label = TACTIC_LABELS.get(moment.tactic_type, moment.tactic_type)
-            tactic_color = TACTIC_COLORS.get(moment.tactic_type, "#7f8c8d")
-            is_missed = moment.moment_type in ("missed_chance", "missed_mate")
-            if is_missed:
-                tactic_label = f"Missed {tactic_label}"
+            moment_type = moment.moment_type
+            severity = moment.severity
+            tactic_type = moment.tactic_type
+            type_label = MOMENT_TYPE_LABELS.get(moment_type, "Blunder")  # constant, markup-free
+            severity_label = severity.upper()
+            severity_color = SEVERITY_COLORS.get(severity, "#7f8c8d")
+            tactic_color = TACTIC_COLORS.get(tactic_type, "#7f8c8d")
+            is_missed = moment_type in _MISSED_TYPES
+            tactic_label = _tactic_label(tactic_type, is_missed)
 
             # Per-moment deep link to Lichess position
             moment_link = ""
-            if lichess_url and moment.half_move_number is not None:
-                deep_url = f"{lichess_url}#{moment.half_move_number}"
-                moment_link = f' <a href="{html.escape(deep_url)}" target="_blank" class="moment-lichess-link" title="View on Lichess">&#x2197;</a>'
-
-            parts.append(f'    <div class="moment-card">\n')
-            parts.append(f'        <h2>Moment {i} <span class="moment-type-label">— {type_label}</span>'
-                         f' <span class="severity-pill" style="background:{severity_color}">{severity_label}</span>'
-                         f'{moment_link}</h2>\n')
-            parts.append(f'        <span class="tactic-badge" style="background:{tactic_color}">{html.escape(tactic_label)}</span>\n')
-
-            if moment.svg_content:
-                parts.append(f'        <div class="board-svg">{moment.svg_content}</div>\n')
-
-            parts.append(f'        <div class="fen">FEN: {html.escape(moment.fen)}</div>\n')
-
-            parts.append('        <div class="move-info">\n')
-            if is_missed:
-                parts.append(f'            <span class="move-played">You Played: {html.escape(moment.move_played_san)}</span><br>\n')
-                parts.append(f'            <span class="move-best">You Could Have Played: {html.escape(moment.best_move_san)}</span><br>\n')
-            else:
-                parts.append(f'            <span class="move-played">You Played: {html.escape(moment.move_played_san)}</span><br>\n')
-                parts.append(f'            <span class="move-best">Engine Best: {html.escape(moment.best_move_san)}</span><br>\n')
-            parts.append(f'            <span class="eval-swing">Eval Swing: {moment.eval_swing} cp</span><br>\n')
-            parts.append(f'            <span class="variation">Variation: {html.escape(moment.pv_line)}</span>\n')
-            parts.append('        </div>\n')
-
-            if is_missed and moment.best_line:
-                formatted_best = format_refutation_line(moment.best_line, hero_is_next_to_move=True)
-                parts.append(f'        <div class="best-line">You could have played: {formatted_best}</div>\n')
-
-            if moment.tactical_alert:
-                parts.append(f'        <div class="tactical-alert">{html.escape(moment.tactical_alert)}</div>\n')
-
-            if moment.refutation_line and not is_missed:
-                formatted_ref = format_refutation_line(moment.refutation_line, hero_is_next_to_move=False)
-                parts.append(f'        <div class="variation" style="margin-bottom:12px">Refutation: {formatted_ref}</div>\n')
-
-            if moment.explanation:
-                parts.append('        <div class="explanation">\n')
-                parts.append('            <h3>Coach Explanation</h3>\n')
-                parts.append(f'            <p>{_md_to_html(moment.explanation)}</p>\n')
-                parts.append('        </div>\n')
-
-            parts.append('    </div>\n')
+            half_move_number = moment.half_move_number
+            if lichess_url and half_move_number is not None:
+                deep_url = f"{lichess_url}#{half_move_number}"
+                moment_link = f' <a href="{_esc(deep_url)}" target="_blank" class="moment-lichess-link" title="View on Lichess">&#x2197;</a>'
+
+            svg_content = moment.svg_content
+            board_html = f'        <div class="board-svg">{svg_content}</div>\n' if svg_content else ''
+            best_prefix = "You Could Have Played" if is_missed else "Engine Best"
+
+            best_line_html = ""
+            best_line = moment.best_line
+            if is_missed and best_line:
+                formatted_best = format_refutation_line(best_line, hero_is_next_to_move=True)
+                best_line_html = f'        <div class="best-line">You could have played: {formatted_best}</div>\n'
+
+            alert_html = ""
+            tactical_alert = moment.tactical_alert
+            if tactical_alert:
+                alert_html = f'        <div class="tactical-alert">{_esc(tactical_alert)}</div>\n'
+
+            refutation_html = ""
+            refutation_line = moment.refutation_line
+            if refutation_line and not is_missed:
+                formatted_ref = format_refutation_line(refutation_line, hero_is_next_to_move=False)
+                refutation_html = f'        <div class="variation" style="margin-bottom:12px">Refutation: {formatted_ref}</div>\n'
+
+            explanation_html = ""
+            explanation = moment.explanation
+            if explanation:
+                explanation_html = (
+                    '        <div class="explanation">\n'
+                    '            <h3>Coach Explanation</h3>\n'
+                    f'            <p>{_md_to_html(explanation)}</p>\n'
+                    '        </div>\n'
+                )
+
+            parts.append(f"""    <div class="moment-card">
+        <h2>Moment {i} <span class="moment-type-label">— {type_label}</span> <span class="severity-pill" style="background:{severity_color}">{severity_label}</span>{moment_link}</h2>
+        <span class="tactic-badge" style="background:{tactic_color}">{_esc(tactic_label)}</span>
+{board_html}        <div class="fen">FEN: {_esc(moment.fen)}</div>
+        <div class="move-info">
+            <span class="move-played">You Played: {_esc(moment.move_played_san)}</span><br>
+            <span class="move-best">{best_prefix}: {_esc(moment.best_move_san)}</span><br>
+            <span class="eval-swing">Eval Swing: {moment.eval_swing} cp</span><br>
+            <span class="variation">Variation: {_esc(moment.pv_line)}</span>
+        </div>
+{best_line_html}{alert_html}{refutation_html}{explanation_html}    </div>
+""")
 
     if summary:
         parts.append('    <div class="summary-section">\n')
         parts.append(f'        {_md_to_html(summary)}\n')
         parts.append('    </div>\n')
 
-    # Annotated PGN
     if move_evals:
-        pgn_string = generate_annotated_pgn(metadata, move_evals, moments)
-        if pgn_string:
-            pgn_escaped = html.escape(pgn_string)
-            parts.append('    <h2 style="margin-top:24px;margin-bottom:12px">Annotated PGN</h2>\n')
-            parts.append('    <p style="font-size:0.85rem;color:#666;margin-bottom:8px">'
-                         'Copy this PGN to paste into Lichess, ChessBase, or any analysis tool.</p>\n')
-            parts.append("""    <div style="
-        background:#1a1a2e;color:#e0e0e0;padding:16px 20px;border-radius:8px;
-        font-family:'SF Mono','Fira Code','Consolas',monospace;font-size:0.8rem;
-        line-height:1.6;white-space:pre-wrap;word-break:break-word;position:relative;
-        max-height:400px;overflow-y:auto;">
-        <button onclick="navigator.clipboard.writeText(this.nextElementSibling.textContent)"
-            style="position:absolute;top:8px;right:8px;background:#333;color:#ccc;
-            border:1px solid #555;padding:4px 12px;border-radius:4px;cursor:pointer;
-            font-size:0.75rem;">Copy</button>
-""")
-            parts.append(f'        <code id="annotated-pgn">{pgn_escaped}</code>\n')
-            parts.append('    </div>\n')
+        _emit_pgn_block(parts, metadata, move_evals, moments)
 
-    parts.append("""</div>
-</body>
-</html>
-""")
+    parts.append(_HTML_FOOTER)
 
     with open(output_path, "w", encoding="utf-8") as f:
         f.write("".join(parts))
@@ -709,110 +885,105 @@ def generate_html_report(moments: List[CrucialMoment], metadata: Dict[str, str],
     logger.info(f"HTML report generated: {output_path}")
 
 
+_INDEX_CACHE_FILENAME = ".index_cache.json"
+_INDEX_READ_WORKERS = min(16, (os.cpu_count() or 1) * 4)
+
+
+def _read_report_meta(path: str) -> Optional[Dict[str, Any]]:
+    """Extracts the report-data JSON from the head of a report file, or None if absent."""
+    # Search raw bytes; only the matched metadata gets decoded
+    with open(path, 'rb') as f:
+        head = f.read(4096)  # metadata is near the top
+    match = _REPORT_META_RE.search(head)
+    if not match:
+        return None
+    meta = json.loads(html.unescape(match.group(1).decode('utf-8')))
+    if not isinstance(meta, dict):
+        raise ValueError(f"report-data is a JSON {type(meta).__name__}, not an object")
+    return meta
+
+
+def _try_read_report_meta(path: str) -> Tuple[Optional[Dict[str, Any]], Optional[Exception]]:
+    """_read_report_meta for use in a thread pool: returns (meta, error) instead of raising."""
+    try:
+        return _read_report_meta(path), None
+    except Exception as e:
+        return None, e
+
+
+def _load_index_cache(path: str) -> Dict[str, Any]:
+    """Loads the per-report metadata cache used by regenerate_index_page."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
 def regenerate_index_page(html_output_dir: str):
     """
     Scans html_output_dir for report HTML files and generates an index.html listing them.
 
+    Extracted metadata is cached in .index_cache.json keyed by each file's
+    mtime and size, so unchanged reports are not re-read on later runs.
+
     Args:
         html_output_dir: Directory containing the HTML report files.
     """
-    if not os.path.exists(html_output_dir):
-        os.makedirs(html_output_dir)
-
-    reports = []
-    for fname in os.listdir(html_output_dir):
-        if not fname.endswith('.html') or fname == 'index.html':
-            continue
-        fpath = os.path.join(html_output_dir, fname)
+    os.makedirs(html_output_dir, exist_ok=True)
+    _ensure_stylesheet(html_output_dir)
+
+    cache_path = os.path.join(html_output_dir, _INDEX_CACHE_FILENAME)
+    cache = _load_index_cache(cache_path)
+    new_cache: Dict[str, Any] = {}
+    stale: List[Tuple[str, str, List[int]]] = []
+    with os.scandir(html_output_dir) as it:
+        for dir_entry in it:
+            fname = dir_entry.name
+            if not fname.endswith('.html') or fname == 'index.html':
+                continue
+            try:
+                # Only re-read reports whose (mtime, size) changed since the last run
+                st = dir_entry.stat()
+            except OSError as e:
+                logger.warning(f"Could not read metadata from {fname}: {e}")
+                continue
+            stamp = [st.st_mtime_ns, st.st_size]
+            cached = cache.get(fname)
+            # Entries from a hand-edited or older cache must still carry a
+            # usable meta (None means the report had no metadata)
+            if (isinstance(cached, dict) and cached.get("stamp") == stamp
+                    and (cached.get("meta") is None or isinstance(cached["meta"], dict))):
+                new_cache[fname] = cached
+            else:
+                stale.append((fname, dir_entry.path, stamp))
+
+    # Reading reports is I/O-bound, so fan the stale ones out across threads
+    if stale:
+        workers = min(_INDEX_READ_WORKERS, len(stale))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(_try_read_report_meta, [path for _, path, _ in stale])
+            for (fname, _, stamp), (meta, error) in zip(stale, results):
+                if error is not None:
+                    logger.warning(f"Could not read metadata from {fname}: {error}")
+                    continue
+                new_cache[fname] = {"stamp": stamp, "meta": meta}
+
+    reports = [dict(entry["meta"], filename=fname)
+               for fname, entry in new_cache.items() if entry.get("meta")]
+
+    if new_cache != cache:
         try:
-            with open(fpath, 'r', encoding='utf-8') as f:
-                content = f.read(4096)  # metadata is near the top
-            match = re.search(r'<meta\s+name="report-data"\s+content=\'([^\']+)\'', content)
-            if match:
-                meta = json.loads(html.unescape(match.group(1)))
-                meta['filename'] = fname
-                reports.append(meta)
-        except Exception as e:
-            logger.warning(f"Could not read metadata from {fname}: {e}")
+            with open(cache_path, "w", encoding="utf-8") as f:
+                json.dump(new_cache, f, separators=(',', ':'))
+        except OSError as e:
+            logger.warning(f"Could not write index cache: {e}")
 
     # Sort by date descending
     reports.sort(key=lambda r: r.get('date', ''), reverse=True)
 
-    parts = []
-    parts.append(f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Analysis Reports</title>
-    <style>{_HTML_STYLE}</style>
-</head>
-<body>
-<div class="container">
-    <h1>Analysis Reports</h1>
-    <div class="meta">Game analysis with Stockfish engine and AI coach explanations.</div>
-    <div class="run-bar">
-        <button class="run-btn" id="runBtn" onclick="triggerAnalysis()">&#9654; Run Analysis</button>
-        <span class="run-status" id="runStatus"></span>
-        <span class="token-link" id="tokenLink" onclick="resetToken()" title="Update stored GitHub token" style="display:none">[change token]</span>
-    </div>
-    <script>
-    (function() {{
-        var tokenLink = document.getElementById('tokenLink');
-        if (localStorage.getItem('gh_actions_pat')) tokenLink.style.display = '';
-    }})();
-
-    function triggerAnalysis() {{
-        var pat = localStorage.getItem('gh_actions_pat');
-        if (!pat) {{
-            pat = prompt('Enter a GitHub fine-grained PAT with Actions: write scope for e-riveras/chess-tools:');
-            if (!pat) return;
-            localStorage.setItem('gh_actions_pat', pat.trim());
-            document.getElementById('tokenLink').style.display = '';
-        }}
-        var btn = document.getElementById('runBtn');
-        var status = document.getElementById('runStatus');
-        btn.disabled = true;
-        btn.textContent = '⏳ Triggering…';
-        status.className = 'run-status';
-        status.textContent = '';
-        fetch('https://api.github.com/repos/e-riveras/chess-tools/actions/workflows/sync.yml/dispatches', {{
-            method: 'POST',
-            headers: {{
-                'Authorization': 'Bearer ' + localStorage.getItem('gh_actions_pat'),
-                'Accept': 'application/vnd.github+json',
-                'Content-Type': 'application/json'
-            }},
-            body: JSON.stringify({{ ref: 'main' }})
-        }}).then(function(r) {{
-            btn.disabled = false;
-            btn.innerHTML = '&#9654; Run Analysis';
-            if (r.status === 204) {{
-                status.className = 'run-status ok';
-                status.textContent = '✓ Workflow triggered — check Actions tab for progress.';
-            }} else if (r.status === 401 || r.status === 403) {{
-                status.className = 'run-status err';
-                status.textContent = '✗ Auth failed. Token may be invalid or lack Actions: write scope.';
-            }} else {{
-                status.className = 'run-status err';
-                status.textContent = '✗ Error ' + r.status + '. Check token permissions.';
-            }}
-        }}).catch(function(e) {{
-            btn.disabled = false;
-            btn.innerHTML = '&#9654; Run Analysis';
-            status.className = 'run-status err';
-            status.textContent = '✗ Network error: ' + e.message;
-        }});
-    }}
-
-    function resetToken() {{
-        localStorage.removeItem('gh_actions_pat');
-        document.getElementById('tokenLink').style.display = 'none';
-        document.getElementById('runStatus').textContent = '';
-        alert('Token cleared. You will be prompted on next run.');
-    }}
-    </script>
-""")
+    parts = [_HTML_HEAD_OPEN, _INDEX_PAGE_PROLOGUE]
 
     if not reports:
         parts.append('    <p class="no-reports">No analysis reports yet.</p>\n')
@@ -834,10 +1005,7 @@ def regenerate_index_page(html_output_dir: str):
 """)
         parts.append('    </div>\n')
 
-    parts.append("""</div>
-</body>
-</html>
-""")
+    parts.append(_HTML_FOOTER)
 
     index_path = os.path.join(html_output_dir, "index.html")
     with open(index_path, "w", encoding="utf-8") as f:
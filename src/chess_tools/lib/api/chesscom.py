@@ -1,9 +1,22 @@
 import requests
 import logging
-from typing import List, Dict
+from typing import List, Dict, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 logger = logging.getLogger("chess_transfer")
 
+REQUEST_TIMEOUT_SECONDS = 10
+
+# Shared across calls so archive fetches reuse one keep-alive connection.
+# Chess.com may answer parallel requests with 429, so that is retried along
+# with transient gateway errors (urllib3 honors Retry-After on 429).
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_maxsize=4,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 502, 503, 504]),
+))
+
 def get_chesscom_archives(username: str) -> List[str]:
     """Fetches the list of monthly archives for a Chess.com user."""
     url = f"https://api.chess.com/pub/player/{username}/games/archives"
@@ -11,21 +24,38 @@ def get_chesscom_archives(username: str) -> List[str]:
         'User-Agent': f'ChessTransferBot/1.0 ({username})'
     }
     try:
-        response = requests.get(url, headers=headers)
+        response = _SESSION.get(url, headers=headers, timeout=REQUEST_TIMEOUT_SECONDS)
         response.raise_for_status()
         return response.json().get('archives', [])
     except requests.RequestException as e:
         logger.error(f"Error fetching Chess.com archives: {e}")
         return []
 
-def get_games_from_archive(archive_url: str, username: str = "chess_transfer") -> List[Dict]:
-    """Fetches games from a specific Chess.com archive URL."""
+def get_games_from_archive(archive_url: str, username: str = "chess_transfer",
+                           etags: Optional[Dict[str, str]] = None) -> List[Dict]:
+    """
+    Fetches games from a specific Chess.com archive URL.
+
+    If `etags` is given, a stored ETag for the URL is sent as If-None-Match and
+    an unchanged archive (304) returns no games. The archive's current ETag is
+    written back into `etags`.
+    """
     headers = {
         'User-Agent': f'ChessTransferBot/1.0 ({username})'
     }
+    if etags and archive_url in etags:
+        headers['If-None-Match'] = etags[archive_url]
     try:
-        response = requests.get(archive_url, headers=headers)
+        response = _SESSION.get(archive_url, headers=headers, timeout=REQUEST_TIMEOUT_SECONDS)
         response.raise_for_status()
+        if response.status_code == 304:
+            return []
+        if etags is not None:
+            etag = response.headers.get('ETag')
+            if etag:
+                etags[archive_url] = etag
+            else:
+                etags.pop(archive_url, None)
         return response.json().get('games', [])
     except requests.RequestException as e:
         logger.error(f"Error fetching games from archive {archive_url}: {e}")
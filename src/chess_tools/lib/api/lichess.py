@@ -6,6 +6,26 @@ from typing import Optional
 
 logger = logging.getLogger("chess_transfer")
 
+# Lichess asks clients to wait a full minute after a 429; later retries back off further
+RATE_LIMIT_RETRIES = 3
+RATE_LIMIT_BASE_DELAY = 60
+RATE_LIMIT_MAX_DELAY = 240
+
+
+def _rate_limit_delay(attempt: int, retry_after: Optional[str]) -> float:
+    """Seconds to wait before retry number `attempt` (0-based) after a 429.
+
+    Retry-After is honored as given, so the result can exceed RATE_LIMIT_MAX_DELAY.
+    """
+    delay = min(RATE_LIMIT_BASE_DELAY * (2 ** attempt), RATE_LIMIT_MAX_DELAY)
+    if retry_after:
+        try:
+            delay = max(delay, float(retry_after))
+        except ValueError:
+            pass  # HTTP-date form; fall back to the exponential delay
+    return delay
+
+
 def get_lichess_client(token: str) -> berserk.Client:
     """Creates an authenticated berserk client."""
     session = berserk.TokenSession(token)
@@ -47,30 +67,36 @@ def fetch_latest_game(username: str) -> Optional[str]:
 def import_game_to_lichess(client: berserk.Client, pgn: str) -> tuple:
     """
     Imports a PGN to Lichess.
-    Handles rate limits by sleeping and retrying once.
+    Handles rate limits by backing off (honoring Retry-After) and retrying.
 
     Returns:
         Tuple of (status, lichess_url) where status is one of
-        "IMPORTED", "DUPLICATE", "ERROR" and lichess_url is the
-        Lichess game URL on success (or None).
+        "IMPORTED", "DUPLICATE", "ERROR" or "RATE_LIMIT" (retries exhausted,
+        or Retry-After longer than RATE_LIMIT_MAX_DELAY) and lichess_url is
+        the Lichess game URL on success (or None).
     """
     lichess_url = None
+    retry_after = None
 
     def attempt_import():
-        nonlocal lichess_url
+        nonlocal lichess_url, retry_after
         try:
             result = client.games.import_game(pgn)
             lichess_url = result.get('url')
             logger.info(f"Successfully imported game: {lichess_url}")
             return "IMPORTED"
         except berserk.exceptions.ResponseError as e:
-            if "Game already imported" in str(e):
-                 logger.info("Game already imported (API check), skipping.")
-                 return "DUPLICATE"
-
-            if e.status_code == 429 or "Too Many Requests" in str(e):
+            # Status code first; message matching only as a fallback
+            message = str(e)
+            if getattr(e, 'status_code', None) == 429 or "Too Many Requests" in message:
+                response = getattr(e, 'response', None)
+                retry_after = response.headers.get('Retry-After') if response is not None else None
                 return "RATE_LIMIT"
 
+            if "already imported" in message.lower():
+                logger.info("Game already imported (API check), skipping.")
+                return "DUPLICATE"
+
             logger.error(f"Failed to import game: {e}")
             return "ERROR"
         except Exception as e:
@@ -79,12 +105,19 @@ def import_game_to_lichess(client: berserk.Client, pgn: str) -> tuple:
 
     status = attempt_import()
 
-    if status == "RATE_LIMIT":
-        logger.warning("Rate limit reached (429). Sleeping for 60 seconds before retrying...")
-        time.sleep(60)
+    for attempt in range(RATE_LIMIT_RETRIES):
+        if status != "RATE_LIMIT":
+            break
+        delay = _rate_limit_delay(attempt, retry_after)
+        if delay > RATE_LIMIT_MAX_DELAY:
+            logger.error(f"Rate limit reached (429) with Retry-After of {delay:g} seconds. Giving up.")
+            return ("RATE_LIMIT", None)
+        logger.warning(f"Rate limit reached (429). Sleeping for {delay:g} seconds before retrying...")
+        time.sleep(delay)
         status = attempt_import()
-        if status == "RATE_LIMIT":
-            logger.error("Rate limit hit again after retry. Skipping this game.")
-            return ("ERROR", None)
+
+    if status == "RATE_LIMIT":
+        logger.error(f"Rate limit still hit after {RATE_LIMIT_RETRIES} retries. Giving up.")
+        return ("RATE_LIMIT", None)
 
     return (status, lichess_url)
\ No newline at end of file
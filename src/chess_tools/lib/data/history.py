@@ -1,11 +1,16 @@
+import functools
+import hashlib
 import json
 import os
 import logging
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Optional, Tuple
 
 logger = logging.getLogger("chess_transfer")
 
+# (path, sha1 of file contents) as last read or written, to skip no-op saves
+_last_digest: Optional[Tuple[str, bytes]] = None
+
 def _get_repo_root() -> Path:
     """Walks up from this file until the .git directory is found."""
     current = Path(__file__).resolve().parent
@@ -15,32 +20,57 @@ def _get_repo_root() -> Path:
         current = current.parent
     return Path.cwd()
 
+@functools.lru_cache(maxsize=1)
 def get_history_file_path() -> str:
-    """Returns the absolute path to history.json at the repo root."""
+    """Returns the absolute path to history.json at the repo root (resolved once)."""
     return str(_get_repo_root() / 'data' / 'history.json')
 
+def _empty_history() -> Dict:
+    """Returns a fresh history dict for a missing or unreadable file."""
+    return {"imported_ids": [], "last_analyzed_id": None}
+
 def load_history() -> Dict:
     """Loads the history of imported games from a JSON file."""
+    global _last_digest
     history_file = get_history_file_path()
     if not os.path.exists(history_file):
-        return {"imported_ids": [], "last_analyzed_id": None}
+        return _empty_history()
     try:
         with open(history_file, 'r') as f:
-            data = json.load(f)
-            # Ensure schema validity
-            if "last_analyzed_id" not in data:
-                data["last_analyzed_id"] = None
+            raw = f.read()
+            data = json.loads(raw)
+            _last_digest = (history_file, hashlib.sha1(raw.encode()).digest())
+            # Ensure schema validity; setdefault keeps the file's key order
+            data.setdefault("last_analyzed_id", None)
             return data
     except json.JSONDecodeError:
         logger.error("Failed to decode history file. Starting with empty history.")
-        return {"imported_ids": [], "last_analyzed_id": None}
+        return _empty_history()
 
 def save_history(history: Dict):
-    """Saves the history of imported games to a JSON file."""
+    """
+    Saves the history of imported games to a JSON file.
+
+    The JSON is written to a sibling temp file and renamed over history.json,
+    so an interrupted write never leaves a truncated history behind. Nothing
+    is written when the serialized history matches what is already on disk.
+    """
+    global _last_digest
     history_file = get_history_file_path()
+    tmp_file = f"{history_file}.tmp"
     try:
-        os.makedirs(os.path.dirname(history_file), exist_ok=True)
-        with open(history_file, 'w') as f:
-            json.dump(history, f, indent=2)
+        payload = json.dumps(history, indent=2)
+        digest = (history_file, hashlib.sha1(payload.encode()).digest())
+        if digest == _last_digest and os.path.exists(history_file):
+            return
+        os.makedirs(os.path.dirname(history_file) or ".", exist_ok=True)
+        with open(tmp_file, 'w') as f:
+            f.write(payload)
+        os.replace(tmp_file, history_file)
+        _last_digest = digest
     except Exception as e:
         logger.error(f"Failed to save history: {e}")
+        try:
+            os.remove(tmp_file)
+        except OSError:
+            pass
@@ -1,8 +1,13 @@
+import sys
 from dataclasses import dataclass
 from typing import Optional
 import chess
 
-@dataclass
+# slots=True needs Python 3.10+; CI still runs 3.9, where instances keep a __dict__
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_SLOTS)
 class CrucialMoment:
     """
     Represents a significant moment in a chess game where the evaluation changed drastically.
@@ -1,6 +1,6 @@
 """Chess book parsers package."""
 
 from chess_tools.study.parsers.epub_structured import has_movetext_data, parse_structured_epub
-from chess_tools.study.parsers.movetext import parse_movetext
+from chess_tools.study.parsers.movetext import parse_movetext, parse_movetexts
 
-__all__ = ["parse_structured_epub", "has_movetext_data", "parse_movetext"]
+__all__ = ["parse_structured_epub", "has_movetext_data", "parse_movetext", "parse_movetexts"]
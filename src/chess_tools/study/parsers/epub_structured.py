@@ -12,7 +12,7 @@ from xml.etree import ElementTree
 import chess.pgn
 from bs4 import BeautifulSoup, NavigableString
 
-from chess_tools.study.parsers.movetext import parse_movetext
+from chess_tools.study.parsers.movetext import parse_movetexts
 
 
 def has_movetext_data(epub_path: str) -> bool:
@@ -263,10 +263,11 @@ def _extract_games_from_soup(
     # Extract game headers (game_index -> header info)
     game_headers = _extract_game_headers(soup)
 
+    indices = sorted(movetexts)
+    parsed = parse_movetexts([(movetexts[idx], fens.get(idx)) for idx in indices])
+
     games = []
-    for idx, movetext_value in sorted(movetexts.items()):
-        fen = fens.get(idx)
-        game, mapping = parse_movetext(movetext_value, fen)
+    for idx, (game, mapping) in zip(indices, parsed):
         if game is None:
             continue
 
@@ -2,7 +2,7 @@
 
 import io
 import re
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import chess
 import chess.pgn
@@ -10,6 +10,8 @@ import chess.pgn
 
 STANDARD_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
 
+_ROOT_PREFIX_RE = re.compile(r"^root\s*")
+
 
 def parse_movetext(
     movetext: str, fen: Optional[str] = None
@@ -39,13 +41,59 @@ def parse_movetext(
     return game, mapping
 
 
+def parse_movetexts(
+    items: List[Tuple[str, Optional[str]]],
+) -> List[Tuple[Optional[chess.pgn.Game], Dict[Tuple[int, int], chess.pgn.GameNode]]]:
+    """Parse many (movetext, fen) pairs through a single PGN stream.
+
+    Equivalent to calling parse_movetext() on each item, but the wrapped
+    games are joined into one buffer and read sequentially, which amortizes
+    the per-call parser setup across a whole file.
+
+    Returns:
+        One (game, mapping) pair per input item, in input order.
+    """
+    results: List[Tuple[Optional[chess.pgn.Game], Dict[Tuple[int, int], chess.pgn.GameNode]]] = [
+        (None, {}) for _ in items
+    ]
+
+    positions = []
+    chunks = []
+    for pos, (movetext, fen) in enumerate(items):
+        cleaned = _clean_movetext(movetext)
+        if cleaned:
+            positions.append(pos)
+            chunks.append(_wrap_as_pgn(cleaned, fen))
+    if not chunks:
+        return results
+
+    buf = io.StringIO("\n\n".join(chunks))
+    games = []
+    while True:
+        game = chess.pgn.read_game(buf)
+        if game is None:
+            break
+        games.append(game)
+
+    # Movetext that confuses game boundaries would shift every later result;
+    # fall back to isolated parsing rather than misattributing games.
+    if len(games) != len(positions):
+        return [parse_movetext(movetext, fen) for movetext, fen in items]
+
+    for pos, game in zip(positions, games):
+        results[pos] = (game, _build_mv_mapping(game))
+    return results
+
+
 def _clean_movetext(movetext: str) -> str:
     """Clean a raw MOVETEXT string for python-chess parsing."""
     # Strip the "root" prefix
-    text = re.sub(r"^root\s*", "", movetext)
+    text = _ROOT_PREFIX_RE.sub("", movetext)
 
-    # Normalize castling: 0-0-0 before 0-0 to avoid partial replacement
-    text = text.replace("0-0-0", "O-O-O").replace("0-0", "O-O")
+    # Normalize castling: 0-0-0 before 0-0 to avoid partial replacement.
+    # One membership scan skips both replaces for movetext without castling.
+    if "0-0" in text:
+        text = text.replace("0-0-0", "O-O-O").replace("0-0", "O-O")
 
     return text.strip()
 
@@ -68,31 +116,35 @@ def _build_mv_mapping(
     Walks the game tree in PGN serialization order:
     - Mainline child inherits parent's variation ID
     - Sub-variations get incrementing IDs
-    - Sub-variations are fully recursed before continuing mainline
+    - Sub-variations are fully walked before continuing mainline
 
     This matches the gXmYvZ encoding in the EPUB HTML.
     """
     mapping: Dict[Tuple[int, int], chess.pgn.GameNode] = {}
-    var_counter = [0]  # mutable counter shared across recursion
-
-    def walk(node: chess.pgn.GameNode, ply: int, current_v: int) -> None:
-        if not node.variations:
-            return
-
-        main = node.variations[0]
+    var_counter = 0
+
+    # Explicit DFS stack instead of recursion: deep mainlines cost no Python
+    # frames. Sub-variations are pushed with v=None and numbered when popped,
+    # so IDs follow the same order as the recursive walk.
+    stack = [(game, 0, 0)]
+    while stack:
+        node, ply, current_v = stack.pop()
+        if current_v is None:
+            var_counter += 1
+            current_v = var_counter
+            mapping[(ply, current_v)] = node
+
+        variations = node.variations
+        if not variations:
+            continue
+
+        main = variations[0]
         main_ply = ply + 1
         mapping[(main_ply, current_v)] = main
 
-        # Process sub-variations (get new variation IDs)
-        for i in range(1, len(node.variations)):
-            var = node.variations[i]
-            var_counter[0] += 1
-            new_v = var_counter[0]
-            mapping[(main_ply, new_v)] = var
-            walk(var, main_ply, new_v)
-
-        # Continue mainline
-        walk(main, main_ply, current_v)
+        # Mainline is pushed first so it resumes after all sub-variations
+        stack.append((main, main_ply, current_v))
+        for var in reversed(variations[1:]):
+            stack.append((var, main_ply, None))
 
-    walk(game, 0, 0)
     return mapping
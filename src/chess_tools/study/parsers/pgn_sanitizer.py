@@ -1,5 +1,13 @@
 import re
 
+# A move number followed directly by a move, in one pass:
+#   "1...e5" -> "1... e5" (digit + ... + non-space)
+#   "1.e4"   -> "1. e4"   (digit + dot + non-space, and not a further dot)
+# Lookaheads leave the following character unconsumed, so adjacent move
+# numbers ("3.1.e4") are each fixed.
+_MOVE_NUMBER_RE = re.compile(r'(\d+\.\.\.(?=\S)|\d+\.(?=[^\s\.]))')
+
+
 class PGNSanitizer:
     @staticmethod
     def sanitize(pgn_text: str) -> str:
@@ -9,12 +17,4 @@ class PGNSanitizer:
         - Adds space after variation black move numbers (1...e5 -> 1... e5)
         - Ensures space before move numbers
         """
-        # 1. Add space after single dot move numbers: "1.e4" -> "1. e4"
-        # Look for digit + dot + non-space
-        pgn_text = re.sub(r'(\d+\.)([^\s\.])', r'\1 \2', pgn_text)
-
-        # 2. Add space after triple dot move numbers: "1...e5" -> "1... e5"
-        # Look for digit + ... + non-space
-        pgn_text = re.sub(r'(\d+\.\.\.)([^\s])', r'\1 \2', pgn_text)
-
-        return pgn_text
+        return _MOVE_NUMBER_RE.sub(r'\1 ', pgn_text)
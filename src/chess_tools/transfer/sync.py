@@ -1,8 +1,9 @@
 import os
 import logging
 import time
-from datetime import datetime
-from urllib.parse import urlparse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from chess_tools.lib.utils import check_env_var, get_output_dir, get_repo_root
 from chess_tools.lib.api.lichess import get_lichess_client, get_lichess_username, import_game_to_lichess
 from chess_tools.lib.api.chesscom import get_chesscom_archives, get_games_from_archive
@@ -17,6 +18,62 @@ logger = logging.getLogger("chess_transfer")
 MAX_IMPORTS_PER_RUN = 100
 IMPORT_DELAY_SECONDS = 6
 DUPLICATE_DELAY_SECONDS = 1
+ARCHIVE_PREFETCH = 3
+
+
+def _game_id(url: str) -> str:
+    """Extract the Chess.com game ID (last path segment) from a game URL."""
+    # Game URLs carry no query or fragment, so a full urlparse is unnecessary
+    return url.rstrip('/').rpartition('/')[2]
+
+
+def _archive_month(url: str) -> tuple:
+    """Sort key for archive URLs ending in .../games/YYYY/MM: (year, month)."""
+    year, _, month = url.rstrip('/').rpartition('/')
+    try:
+        return (int(year.rpartition('/')[2]), int(month))
+    except ValueError:
+        return (0, 0)
+
+
+class _ImportPacer:
+    """
+    Spaces out Lichess imports. Rather than sleeping after every import, the
+    next import waits only for what is left of the previous delay, so request
+    time counts toward it and the last import of a run adds no trailing sleep.
+    """
+
+    def __init__(self):
+        self._ready_at = 0.0
+
+    def wait(self):
+        remaining = self._ready_at - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
+
+    def defer(self, seconds: float):
+        self._ready_at = time.monotonic() + seconds
+
+
+def _iter_archive_games(archives, username, etags=None):
+    """
+    Yields (archive_url, games) in archive order while the next few archives
+    are fetched in the background, overlapping their network round trips.
+    `etags` is passed through to get_games_from_archive.
+    """
+    urls = iter(archives)
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=ARCHIVE_PREFETCH) as executor:
+        for url in urls:
+            pending.append((url, executor.submit(get_games_from_archive, url, username, etags=etags)))
+            if len(pending) == ARCHIVE_PREFETCH:
+                break
+        while pending:
+            url, future = pending.popleft()
+            next_url = next(urls, None)
+            if next_url is not None:
+                pending.append((next_url, executor.submit(get_games_from_archive, next_url, username, etags=etags)))
+            yield url, future.result()
 
 
 def run_sync_pipeline():
@@ -40,22 +97,40 @@ def run_sync_pipeline():
     history = load_history()
     imported_ids = set(history.get("imported_ids", []))
     last_analyzed_id = history.get("last_analyzed_id")
+    # ETags of archives whose games were all imported; an unchanged one (304) needs no work
+    archive_etags = dict(history.get("archive_etags", {}))
+    # Archives whose ETag was recorded after their month had closed: they cannot gain games
+    sealed_archives = set(history.get("sealed_archives", []))
 
     logger.info(f"Loaded {len(imported_ids)} imported games.")
 
     # 2. Get Chess.com archives
     archives = get_chesscom_archives(chesscom_username)
-    archives.sort(reverse=True) 
+    archives.sort(key=_archive_month, reverse=True)
     
     actions_count = 0
+    history_dirty = False
+    rate_limited = False
     lichess_url_map: dict = {}
+    pacer = _ImportPacer()
 
     # Track the absolute latest game found in the archives
     latest_candidate_game = None
 
-    for archive_url in archives:
+    # The newest archive is always fetched in full: it supplies the game to analyze
+    fetch_etags = {u: e for u, e in archive_etags.items() if not archives or u != archives[0]}
+
+    # Months before last month are closed. An ETag recorded for such a month covers
+    # all of its games, so the archive is sealed and not requested again; an ETag
+    # recorded while the month was still open only earns a conditional request
+    now = datetime.now(timezone.utc)
+    sealed_before = (now.year, now.month - 1) if now.month > 1 else (now.year - 1, 12)
+    to_fetch = [u for i, u in enumerate(archives) if i == 0 or u not in sealed_archives]
+    if len(to_fetch) < len(archives):
+        logger.info(f"Skipping {len(archives) - len(to_fetch)} closed, fully imported archives.")
+
+    for archive_url, games in _iter_archive_games(to_fetch, chesscom_username, etags=fetch_etags):
         logger.info(f"Checking archive: {archive_url}")
-        games = get_games_from_archive(archive_url, chesscom_username)
 
         # Chess.com API returns games oldest-first within each archive.
         # After reversing, games are processed newest-first.
@@ -65,53 +140,80 @@ def run_sync_pipeline():
                 url_g = g.get('url', '')
                 pgn_g = g.get('pgn', '')
                 if url_g and pgn_g:
-                    gid = urlparse(url_g).path.rstrip('/').split('/')[-1]
-                    latest_candidate_game = {'id': gid, 'pgn': pgn_g}
+                    latest_candidate_game = {'id': _game_id(url_g), 'pgn': pgn_g}
                     break
 
-        games.reverse()
-
-        for game in games:
+        # Only games not yet imported need any work; most archives have none.
+        # Keyed by game ID, so a game listed twice is imported at most once.
+        unseen = {}
+        for game in reversed(games):
             url = game.get('url')
+            if not url:
+                continue
+            game_id = _game_id(url)
+            # Membership first: already-imported games never touch their PGN
+            if game_id not in imported_ids and game.get('pgn'):
+                unseen.setdefault(game_id, game)
+
+        for game_id, game in unseen.items():
             end_time = game.get('end_time')
             pgn = game.get('pgn')
-            time_class = game.get('time_class')
 
-            if not url or not pgn:
-                continue
-
-            game_id = urlparse(url).path.rstrip('/').split('/')[-1]
-            
             # --- STEP 1: IMPORT ---
-            if game_id not in imported_ids:
-                logger.info(f"Found new game {game_id} ended at {datetime.fromtimestamp(end_time)}. Attempting import...")
-                import_status, lichess_url = import_game_to_lichess(client, pgn)
-
-                if import_status == "IMPORTED" or import_status == "DUPLICATE":
-                    imported_ids.add(game_id)
-                    actions_count += 1
-                    if import_status == "IMPORTED":
-                        if lichess_url:
-                            lichess_url_map[game_id] = lichess_url
-                        time.sleep(IMPORT_DELAY_SECONDS)
-                    else:
-                        time.sleep(DUPLICATE_DELAY_SECONDS)
-                else:
-                    time.sleep(DUPLICATE_DELAY_SECONDS)
-                    continue
+            logger.info(f"Found new game {game_id} ended at {datetime.fromtimestamp(end_time)}. Attempting import...")
+            pacer.wait()
+            import_status, lichess_url = import_game_to_lichess(client, pgn)
 
-            # Update history object in memory
-            history["imported_ids"] = sorted(list(imported_ids))
+            if import_status == "IMPORTED" or import_status == "DUPLICATE":
+                imported_ids.add(game_id)
+                history_dirty = True
+                actions_count += 1
+                if import_status == "IMPORTED":
+                    if lichess_url:
+                        lichess_url_map[game_id] = lichess_url
+                    pacer.defer(IMPORT_DELAY_SECONDS)
+                else:
+                    pacer.defer(DUPLICATE_DELAY_SECONDS)
+            elif import_status == "RATE_LIMIT":
+                # Further imports would hit the same limit; resume on the next run
+                logger.warning("Lichess rate limit persists. Saving and stopping imports for this run.")
+                rate_limited = True
+                break
+            else:
+                pacer.defer(DUPLICATE_DELAY_SECONDS)
+                continue
 
             if actions_count >= max_imports:
                 logger.info(f"Reached limit of {max_imports} actions for this run. Saving and stopping.")
-                save_history(history)
                 break
-        
-        if actions_count >= max_imports:
+
+        # Remember the ETag only once every game in this archive version is imported
+        etag = fetch_etags.get(archive_url)
+        if etag and all(game_id in imported_ids for game_id in unseen):
+            if archive_etags.get(archive_url) != etag:
+                archive_etags[archive_url] = etag
+                history_dirty = True
+            if archive_url not in sealed_archives and (0, 0) < _archive_month(archive_url) < sealed_before:
+                sealed_archives.add(archive_url)
+                history_dirty = True
+        else:
+            if archive_etags.pop(archive_url, None) is not None:
+                history_dirty = True
+            if archive_url in sealed_archives:
+                sealed_archives.discard(archive_url)
+                history_dirty = True
+
+        if rate_limited or actions_count >= max_imports:
             break
-        
-    save_history(history)
+
+    # Sorted once here rather than after every game; skipped when nothing was imported
+    if history_dirty:
+        history["imported_ids"] = sorted(imported_ids)
+        if archive_etags or "archive_etags" in history:
+            history["archive_etags"] = archive_etags
+        if sealed_archives or "sealed_archives" in history:
+            history["sealed_archives"] = sorted(sealed_archives)
+        save_history(history)
     logger.info(f"Sync complete. {actions_count} actions performed.")
 
     # --- STEP 2: ANALYSIS LOGIC ---
@@ -7,7 +7,7 @@ from unittest.mock import patch
 import chess.pgn
 import pytest
 
-from chess_tools.study.parsers.movetext import parse_movetext, _clean_movetext, _build_mv_mapping
+from chess_tools.study.parsers.movetext import parse_movetext, parse_movetexts, _clean_movetext, _build_mv_mapping
 from chess_tools.study.parsers.epub_structured import (
     has_movetext_data,
     parse_structured_epub,
@@ -108,6 +108,53 @@ class TestMovetext:
         assert mapping[(17, 3)].san() == "d3"     # g0m17v3 = 9.d3
         assert mapping[(19, 4)].san() == "Nd5"    # g0m19v4 = 10.Nd5
 
+    def test_mv_mapping_nested_variation_order(self):
+        """Nested sub-variations are numbered before later siblings."""
+        game, mapping = parse_movetext("root 1.e4 (1.d4 d5 (1...Nf6)) (1.c4) e5")
+        assert mapping[(1, 0)].san() == "e4"
+        assert mapping[(1, 1)].san() == "d4"
+        assert mapping[(2, 2)].san() == "Nf6"
+        assert mapping[(1, 3)].san() == "c4"
+        assert mapping[(2, 0)].san() == "e5"
+
+    def test_mv_mapping_deep_mainline(self):
+        """Long mainlines must not hit the recursion limit."""
+        game = chess.pgn.Game()
+        node = game
+        for _ in range(500):
+            for move in ("g1f3", "g8f6", "f3g1", "f6g8"):
+                node = node.add_main_variation(chess.Move.from_uci(move))
+        mapping = _build_mv_mapping(game)
+        assert len(mapping) == 2000
+        assert mapping[(2000, 0)] is node
+
+    def test_parse_movetexts_matches_single_parse(self):
+        fen = "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1"
+        items = [
+            ("root 1.e4 e5 (1...c5 2.Nf3) 2.Nf3", None),
+            ("root", None),
+            ("root 1...e5 2.Nf3 Nc6", fen),
+        ]
+        results = parse_movetexts(items)
+        assert len(results) == 3
+        for (game, mapping), (movetext, item_fen) in zip(results, items):
+            expected_game, expected_mapping = parse_movetext(movetext, item_fen)
+            if expected_game is None:
+                assert game is None and mapping == {}
+                continue
+            assert str(game) == str(expected_game)
+            assert {k: n.san() for k, n in mapping.items()} == {
+                k: n.san() for k, n in expected_mapping.items()
+            }
+
+    def test_parse_movetexts_empty(self):
+        assert parse_movetexts([]) == []
+
+    def test_parse_movetexts_empty_items_do_not_share_mapping(self):
+        results = parse_movetexts([("root", None), ("root ", None)])
+        assert results == [(None, {}), (None, {})]
+        assert results[0][1] is not results[1][1]
+
 
 class TestGameHeaders:
     """Tests for game header extraction."""
@@ -16,6 +16,13 @@ class TestPGNSanitizer(unittest.TestCase):
         expected = "1. c4 e5 2. Nc3 Nf6 3. g3 3... d5"
         self.assertEqual(PGNSanitizer.sanitize(raw), expected)
 
+    def test_sanitize_leaves_double_dot_alone(self):
+        self.assertEqual(PGNSanitizer.sanitize("1..e5"), "1..e5")
+
+    def test_sanitize_adjacent_move_numbers(self):
+        self.assertEqual(PGNSanitizer.sanitize("3.1.e4"), "3. 1. e4")
+        self.assertEqual(PGNSanitizer.sanitize("1...2...e5"), "1... 2... e5")
+
     def test_sanitize_already_correct(self):
         raw = "1. c4 e5 2. Nc3"
         self.assertEqual(PGNSanitizer.sanitize(raw), raw)
@@ -1,10 +1,12 @@
 import unittest
 from unittest.mock import MagicMock, patch, Mock, mock_open
 import os
+import json
+import tempfile
 from chess_tools.lib.api.lichess import get_lichess_client, import_game_to_lichess
 from chess_tools.lib.api.chesscom import get_chesscom_archives, get_games_from_archive
 from chess_tools.lib.data.history import load_history, save_history
-from chess_tools.transfer.sync import run_sync_pipeline
+from chess_tools.transfer.sync import run_sync_pipeline, _iter_archive_games, _archive_month
 import berserk
 import requests
 
@@ -17,7 +19,7 @@ class TestSyncGames(unittest.TestCase):
         mock_session.assert_called_with('fake_token')
         mock_client.assert_called_once()
 
-    @patch('chess_tools.lib.api.chesscom.requests.get')
+    @patch('chess_tools.lib.api.chesscom._SESSION.get')
     def test_get_chesscom_archives_success(self, mock_get):
         mock_response = Mock()
         mock_response.json.return_value = {'archives': ['url1', 'url2']}
@@ -27,14 +29,28 @@ class TestSyncGames(unittest.TestCase):
         archives = get_chesscom_archives('testuser')
         self.assertEqual(archives, ['url1', 'url2'])
 
-    @patch('chess_tools.lib.api.chesscom.requests.get')
+    @patch('chess_tools.lib.api.chesscom._SESSION.get')
     def test_get_chesscom_archives_failure(self, mock_get):
         mock_get.side_effect = requests.RequestException("Error")
         
         archives = get_chesscom_archives('testuser')
         self.assertEqual(archives, [])
 
-    @patch('chess_tools.lib.api.chesscom.requests.get')
+    @patch('chess_tools.lib.api.chesscom._SESSION.get')
+    def test_get_games_from_archive_etag(self, mock_get):
+        fresh = Mock(status_code=200, headers={'ETag': '"v2"'})
+        fresh.json.return_value = {'games': [{'pgn': '1. e4'}]}
+        mock_get.side_effect = [fresh, Mock(status_code=304)]
+
+        etags = {'url1': '"v1"'}
+        self.assertEqual(len(get_games_from_archive('url1', etags=etags)), 1)
+        self.assertEqual(mock_get.call_args.kwargs['headers']['If-None-Match'], '"v1"')
+        self.assertEqual(etags, {'url1': '"v2"'})
+
+        self.assertEqual(get_games_from_archive('url1', etags=etags), [])
+        self.assertEqual(mock_get.call_args.kwargs['headers']['If-None-Match'], '"v2"')
+
+    @patch('chess_tools.lib.api.chesscom._SESSION.get')
     def test_get_games_from_archive_success(self, mock_get):
         mock_response = Mock()
         mock_response.json.return_value = {'games': [{'pgn': '1. e4'}]}
@@ -94,6 +110,45 @@ class TestSyncGames(unittest.TestCase):
             mock_sleep.assert_called_with(60)
             self.assertEqual(mock_client.games.import_game.call_count, 2)
 
+    def test_import_game_to_lichess_rate_limit_backoff(self):
+        mock_client = MagicMock()
+
+        class MockResponseError(berserk.exceptions.ResponseError):
+            def __init__(self, retry_after=None):
+                self.response = Mock(headers={'Retry-After': retry_after} if retry_after else {})
+            @property
+            def status_code(self):
+                return 429
+            def __str__(self):
+                return "Too Many Requests"
+
+        mock_client.games.import_game.side_effect = [
+            MockResponseError(),
+            MockResponseError(retry_after='150'),
+            MockResponseError(),
+            MockResponseError(),
+        ]
+
+        with patch('chess_tools.lib.api.lichess.time.sleep') as mock_sleep:
+            status, url = import_game_to_lichess(mock_client, 'pgn_data')
+
+        # Exhausted retries are reported as a rate limit so the caller can stop
+        self.assertEqual(status, "RATE_LIMIT")
+        self.assertIsNone(url)
+        # 60s first, Retry-After wins over the 120s backoff, then 240s
+        self.assertEqual([c.args[0] for c in mock_sleep.call_args_list], [60, 150, 240])
+        self.assertEqual(mock_client.games.import_game.call_count, 4)
+
+        # A Retry-After beyond the cap gives up at once instead of retrying too early
+        mock_client.games.import_game.reset_mock()
+        mock_client.games.import_game.side_effect = [MockResponseError(retry_after='600')]
+        with patch('chess_tools.lib.api.lichess.time.sleep') as mock_sleep:
+            status, url = import_game_to_lichess(mock_client, 'pgn_data')
+
+        self.assertEqual(status, "RATE_LIMIT")
+        mock_sleep.assert_not_called()
+        self.assertEqual(mock_client.games.import_game.call_count, 1)
+
     # Patch get_history_file_path to avoid path issues during test
     @patch('chess_tools.lib.data.history.get_history_file_path', return_value='data/history.json')
     def test_load_history_exists(self, mock_path):
@@ -108,15 +163,43 @@ class TestSyncGames(unittest.TestCase):
             history = load_history()
             self.assertEqual(history, {"imported_ids": [], "last_analyzed_id": None})
 
-    @patch('chess_tools.lib.data.history.get_history_file_path', return_value='data/history.json')
-    def test_save_history(self, mock_path):
-        m_open = mock_open()
-        with patch("builtins.open", m_open):
-            save_history({"imported_ids": ["123"]})
-            m_open.assert_called_with('data/history.json', 'w')
+    def test_save_history(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            history_file = os.path.join(tmp_dir, 'data', 'history.json')
+            with patch('chess_tools.lib.data.history.get_history_file_path', return_value=history_file):
+                save_history({"imported_ids": ["123"]})
+            with open(history_file) as f:
+                self.assertEqual(json.load(f), {"imported_ids": ["123"]})
+            self.assertEqual(os.listdir(os.path.dirname(history_file)), ['history.json'])
+
+    def test_save_history_failure_keeps_existing_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            history_file = os.path.join(tmp_dir, 'history.json')
+            with open(history_file, 'w') as f:
+                f.write('{"imported_ids": ["old"]}')
+            with patch('chess_tools.lib.data.history.get_history_file_path', return_value=history_file):
+                save_history({"imported_ids": [object()]})  # not JSON-serializable
+            with open(history_file) as f:
+                self.assertEqual(json.load(f), {"imported_ids": ["old"]})
+            self.assertEqual(os.listdir(tmp_dir), ['history.json'])
+
+    def test_save_history_skips_unchanged(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            history_file = os.path.join(tmp_dir, 'history.json')
+            with patch('chess_tools.lib.data.history.get_history_file_path', return_value=history_file):
+                save_history({"imported_ids": ["123"], "last_analyzed_id": None})
+                history = load_history()
+                with patch('chess_tools.lib.data.history.os.replace') as mock_replace:
+                    save_history(history)
+                    mock_replace.assert_not_called()
+                    history["imported_ids"].append("456")
+                    save_history(history)
+                    mock_replace.assert_called_once()
 
     # Test the Pipeline (Sync)
     # We patch modules where they are IMPORTED in chess_tools.transfer.sync
+    @patch('chess_tools.transfer.sync.regenerate_index_page')
+    @patch('chess_tools.transfer.sync.generate_html_report')
     @patch('chess_tools.transfer.sync.save_analysis_history')
     @patch('chess_tools.transfer.sync.update_analysis_history')
     @patch('chess_tools.transfer.sync.format_history_for_prompt', return_value="")
@@ -131,7 +214,7 @@ class TestSyncGames(unittest.TestCase):
     @patch('chess_tools.transfer.sync.load_history')
     @patch('chess_tools.transfer.sync.save_history')
     @patch('chess_tools.transfer.sync.get_lichess_client')
-    def test_sync_pipeline(self, mock_get_client, mock_save_hist, mock_load_hist, mock_get_archives, mock_get_games, mock_import, mock_sleep, mock_analyzer, mock_narrator, mock_report, mock_load_analysis, mock_format_history, mock_update_analysis, mock_save_analysis):
+    def test_sync_pipeline(self, mock_get_client, mock_save_hist, mock_load_hist, mock_get_archives, mock_get_games, mock_import, mock_sleep, mock_analyzer, mock_narrator, mock_report, mock_load_analysis, mock_format_history, mock_update_analysis, mock_save_analysis, mock_html_report, mock_index_page):
 
         mock_load_hist.return_value = {"imported_ids": ["old_game_id"], "last_analyzed_id": None}
 
@@ -177,10 +260,209 @@ class TestSyncGames(unittest.TestCase):
             mock_load_hist.assert_called_once()
             mock_import.assert_called_once()
             mock_save_hist.assert_called()
+            saved = mock_save_hist.call_args_list[0][0][0]
+            self.assertEqual(saved["imported_ids"], ["new_game_id", "old_game_id"])
 
             # Verify Analysis was triggered
             mock_analyzer_instance.analyze_game.assert_called()
             mock_report.assert_called()
+            mock_html_report.assert_called_once()
+            mock_index_page.assert_called_once()
+
+    @patch('chess_tools.transfer.sync.ChessAnalyzer')
+    @patch('chess_tools.transfer.sync.time.sleep')
+    @patch('chess_tools.transfer.sync.import_game_to_lichess')
+    @patch('chess_tools.transfer.sync.get_games_from_archive')
+    @patch('chess_tools.transfer.sync.get_chesscom_archives')
+    @patch('chess_tools.transfer.sync.load_history')
+    @patch('chess_tools.transfer.sync.save_history')
+    @patch('chess_tools.transfer.sync.get_lichess_client')
+    def test_sync_pipeline_nothing_new(self, mock_get_client, mock_save_hist, mock_load_hist, mock_get_archives, mock_get_games, mock_import, mock_sleep, mock_analyzer):
+        mock_load_hist.return_value = {"imported_ids": ["g1", "g2"], "last_analyzed_id": "g2"}
+        mock_get_archives.return_value = ['archive_2', 'archive_1']
+        mock_get_games.side_effect = lambda url, user, etags=None: [
+            {'url': 'https://chess.com/game/live/g1', 'end_time': 1000, 'pgn': 'pgn1'},
+            {'url': 'https://chess.com/game/live/g2', 'end_time': 2000, 'pgn': 'pgn2'},
+        ]
+
+        with patch.dict(os.environ, {'LICHESS_TOKEN': 'fake_token'}):
+            run_sync_pipeline()
+
+        self.assertEqual(mock_get_games.call_count, 2)
+        mock_import.assert_not_called()
+        mock_sleep.assert_not_called()
+        mock_save_hist.assert_not_called()
+        mock_analyzer.assert_not_called()
+
+    @patch('chess_tools.transfer.sync.time.monotonic', return_value=100.0)
+    @patch('chess_tools.transfer.sync.time.sleep')
+    @patch('chess_tools.transfer.sync.import_game_to_lichess', return_value=("IMPORTED", None))
+    @patch('chess_tools.transfer.sync.get_games_from_archive')
+    @patch('chess_tools.transfer.sync.get_chesscom_archives', return_value=['archive_url'])
+    @patch('chess_tools.transfer.sync.load_history')
+    @patch('chess_tools.transfer.sync.save_history')
+    @patch('chess_tools.transfer.sync.get_lichess_client')
+    def test_sync_pipeline_paces_imports(self, mock_get_client, mock_save_hist, mock_load_hist, mock_get_archives, mock_get_games, mock_import, mock_sleep, mock_monotonic):
+        mock_load_hist.return_value = {"imported_ids": [], "last_analyzed_id": "g2"}
+        mock_get_games.return_value = [
+            {'url': 'https://chess.com/game/live/g1', 'end_time': 1000, 'pgn': 'pgn1'},
+            {'url': 'https://chess.com/game/live/g2', 'end_time': 2000, 'pgn': 'pgn2'},
+        ]
+
+        with patch.dict(os.environ, {'LICHESS_TOKEN': 'fake_token'}):
+            run_sync_pipeline()
+
+        self.assertEqual(mock_import.call_count, 2)
+        # Only the gap between the two imports is waited, not after the last one
+        mock_sleep.assert_called_once_with(6)
+
+    @patch('chess_tools.transfer.sync.time.sleep')
+    @patch('chess_tools.transfer.sync.import_game_to_lichess')
+    @patch('chess_tools.transfer.sync.get_games_from_archive')
+    @patch('chess_tools.transfer.sync.get_chesscom_archives', return_value=['archive_2', 'archive_1'])
+    @patch('chess_tools.transfer.sync.load_history')
+    @patch('chess_tools.transfer.sync.save_history')
+    @patch('chess_tools.transfer.sync.get_lichess_client')
+    def test_sync_pipeline_stops_on_rate_limit(self, mock_get_client, mock_save_hist, mock_load_hist, mock_get_archives, mock_get_games, mock_import, mock_sleep):
+        mock_load_hist.return_value = {"imported_ids": [], "last_analyzed_id": "archive_2-g3"}
+        mock_get_games.side_effect = lambda url, user, etags=None: [
+            {'url': f'https://chess.com/game/live/{url}-g{i}', 'end_time': 1000 * i, 'pgn': f'pgn{i}'}
+            for i in (1, 2, 3)
+        ]
+        mock_import.side_effect = [("IMPORTED", None), ("RATE_LIMIT", None), ("IMPORTED", None)]
+
+        with patch.dict(os.environ, {'LICHESS_TOKEN': 'fake_token'}):
+            run_sync_pipeline()
+
+        # No further games (in this or older archives) are attempted after the limit
+        self.assertEqual(mock_import.call_count, 2)
+        self.assertEqual(mock_save_hist.call_args[0][0]["imported_ids"], ["archive_2-g3"])
+
+    @patch('chess_tools.transfer.sync.time.sleep')
+    @patch('chess_tools.transfer.sync.import_game_to_lichess', return_value=("IMPORTED", None))
+    @patch('chess_tools.transfer.sync.get_games_from_archive')
+    @patch('chess_tools.transfer.sync.get_chesscom_archives', return_value=['archive_url'])
+    @patch('chess_tools.transfer.sync.load_history')
+    @patch('chess_tools.transfer.sync.save_history')
+    @patch('chess_tools.transfer.sync.get_lichess_client')
+    def test_sync_pipeline_imports_repeated_game_once(self, mock_get_client, mock_save_hist, mock_load_hist, mock_get_archives, mock_get_games, mock_import, mock_sleep):
+        mock_load_hist.return_value = {"imported_ids": [], "last_analyzed_id": "g1"}
+        game = {'url': 'https://chess.com/game/live/g1', 'end_time': 1000, 'pgn': 'pgn1'}
+        mock_get_games.return_value = [game, dict(game)]
+
+        with patch.dict(os.environ, {'LICHESS_TOKEN': 'fake_token'}):
+            run_sync_pipeline()
+
+        mock_import.assert_called_once()
+        self.assertEqual(mock_save_hist.call_args[0][0]["imported_ids"], ["g1"])
+
+    @patch('chess_tools.transfer.sync.time.sleep')
+    @patch('chess_tools.transfer.sync.import_game_to_lichess')
+    @patch('chess_tools.transfer.sync.get_games_from_archive')
+    @patch('chess_tools.transfer.sync.get_chesscom_archives', return_value=['archive_2', 'archive_1'])
+    @patch('chess_tools.transfer.sync.load_history')
+    @patch('chess_tools.transfer.sync.save_history')
+    @patch('chess_tools.transfer.sync.get_lichess_client')
+    def test_sync_pipeline_records_archive_etags(self, mock_get_client, mock_save_hist, mock_load_hist, mock_get_archives, mock_get_games, mock_import, mock_sleep):
+        mock_load_hist.return_value = {"imported_ids": ["g1"], "last_analyzed_id": "g2",
+                                       "archive_etags": {"archive_1": '"old"', "archive_2": '"a2"'}}
+        sent = {}
+        def fetch(url, user, etags=None):
+            sent[url] = etags.get(url)
+            etags[url] = f'"{url}-new"'
+            if url == 'archive_2':
+                return [{'url': 'https://chess.com/game/live/g2', 'end_time': 2000, 'pgn': 'pgn2'},
+                        {'url': 'https://chess.com/game/live/g3', 'end_time': 3000, 'pgn': 'pgn3'}]
+            return [{'url': 'https://chess.com/game/live/g1', 'end_time': 1000, 'pgn': 'pgn1'}]
+        mock_get_games.side_effect = fetch
+        mock_import.side_effect = [("IMPORTED", None), ("ERROR", None)]
+
+        with patch.dict(os.environ, {'LICHESS_TOKEN': 'fake_token'}):
+            run_sync_pipeline()
+
+        # The newest archive is never sent a conditional request
+        self.assertEqual(sent, {'archive_2': None, 'archive_1': '"old"'})
+        saved = mock_save_hist.call_args[0][0]
+        # archive_2 had a failed import, so its ETag is dropped until it is complete
+        self.assertEqual(saved["archive_etags"], {"archive_1": '"archive_1-new"'})
+
+    @patch('chess_tools.transfer.sync.get_games_from_archive', return_value=[])
+    @patch('chess_tools.transfer.sync.get_chesscom_archives')
+    @patch('chess_tools.transfer.sync.load_history')
+    @patch('chess_tools.transfer.sync.save_history')
+    @patch('chess_tools.transfer.sync.get_lichess_client')
+    def test_sync_pipeline_skips_closed_imported_archives(self, mock_get_client, mock_save_hist, mock_load_hist, mock_get_archives, mock_get_games):
+        base = 'https://api.chess.com/pub/player/u/games/'
+        mock_get_archives.return_value = [base + '2020/01', base + '2020/02', base + '2020/03', base + '2020/04']
+        mock_load_hist.return_value = {"imported_ids": [], "last_analyzed_id": None, "archive_etags": {
+            base + '2020/04': '"d"', base + '2020/03': '"c"', base + '2020/01': '"a"'},
+            "sealed_archives": [base + '2020/03', base + '2020/04']}
+
+        with patch.dict(os.environ, {'LICHESS_TOKEN': 'fake_token'}):
+            run_sync_pipeline()
+
+        fetched = [c.args[0] for c in mock_get_games.call_args_list]
+        # Newest archive always fetched; old ones unless sealed. 2020/01 only has an
+        # ETag recorded while the month was open, so it still gets a (conditional) request
+        self.assertEqual(fetched, [base + '2020/04', base + '2020/02', base + '2020/01'])
+
+    @patch('chess_tools.transfer.sync.time.sleep')
+    @patch('chess_tools.transfer.sync.import_game_to_lichess', return_value=("IMPORTED", None))
+    @patch('chess_tools.transfer.sync.get_games_from_archive')
+    @patch('chess_tools.transfer.sync.get_chesscom_archives')
+    @patch('chess_tools.transfer.sync.load_history')
+    @patch('chess_tools.transfer.sync.save_history')
+    @patch('chess_tools.transfer.sync.get_lichess_client')
+    def test_sync_pipeline_imports_games_added_after_open_month_etag(self, mock_get_client, mock_save_hist, mock_load_hist, mock_get_archives, mock_get_games, mock_import, mock_sleep):
+        base = 'https://api.chess.com/pub/player/u/games/'
+        mock_get_archives.return_value = [base + '2020/07', base + '2020/10']
+        # 2020/07's ETag was saved while July was open and only g1 existed
+        mock_load_hist.return_value = {"imported_ids": ["g1"], "last_analyzed_id": "g2",
+                                       "archive_etags": {base + '2020/07': '"july-g1"'}}
+        sent = {}
+        def fetch(url, user, etags=None):
+            sent[url] = etags.get(url)
+            etags[url] = '"new"'
+            if url.endswith('2020/07'):
+                return [{'url': 'https://chess.com/game/live/g1', 'end_time': 1000, 'pgn': 'pgn1'},
+                        {'url': 'https://chess.com/game/live/g2', 'end_time': 2000, 'pgn': 'pgn2'}]
+            return []
+        mock_get_games.side_effect = fetch
+
+        with patch.dict(os.environ, {'LICHESS_TOKEN': 'fake_token'}):
+            run_sync_pipeline()
+
+        self.assertEqual(sent[base + '2020/07'], '"july-g1"')
+        mock_import.assert_called_once_with(mock_get_client.return_value, 'pgn2')
+        saved = mock_save_hist.call_args[0][0]
+        self.assertIn("g2", saved["imported_ids"])
+        # Recorded now that July has closed, the ETag seals the archive
+        self.assertIn(base + '2020/07', saved["sealed_archives"])
+
+    def test_archive_month_sorting(self):
+        archives = [
+            'https://api.chess.com/pub/player/u/games/2024/12',
+            'https://api.chess.com/pub/player/u/games/2025/02/',
+            'https://www.chess.com/pub/player/u/games/2025/01',
+        ]
+        archives.sort(key=_archive_month, reverse=True)
+        self.assertEqual([_archive_month(u) for u in archives], [(2025, 2), (2025, 1), (2024, 12)])
+        self.assertEqual(_archive_month('not-an-archive'), (0, 0))
+
+    @patch('chess_tools.transfer.sync.get_games_from_archive')
+    def test_iter_archive_games_preserves_order(self, mock_get_games):
+        import time as real_time
+        def fetch(url, username, etags=None):
+            # Later archives finish first; results must still come back in order
+            real_time.sleep(0.01 * (5 - int(url)))
+            return [url]
+        mock_get_games.side_effect = fetch
+
+        archives = [str(i) for i in range(5)]
+        results = list(_iter_archive_games(archives, 'testuser'))
+
+        self.assertEqual(results, [(u, [u]) for u in archives])
+        self.assertEqual(mock_get_games.call_count, 5)
 
 if __name__ == '__main__':
     unittest.main()
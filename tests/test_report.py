@@ -1,6 +1,22 @@
 """Tests for report generation utilities."""
+import json
+import os
+from unittest.mock import patch
+
+import chess
 import pytest
-from chess_tools.analysis.report import format_refutation_line
+from chess_tools.analysis.report import (
+    _count_moments,
+    _fast_escape,
+    _md_to_html,
+    _safe_name,
+    format_refutation_line,
+    generate_annotated_pgn,
+    generate_eval_chart_svg,
+    generate_html_report,
+    regenerate_index_page,
+)
+from chess_tools.lib.models import CrucialMoment
 
 
 class TestFormatRefutationLine:
@@ -27,3 +43,248 @@ class TestFormatRefutationLine:
         # SAN with special chars should be escaped
         result = format_refutation_line("O-O", hero_is_next_to_move=True)
         assert "O-O" in result
+
+
+def _make_moment(**kwargs):
+    defaults = dict(
+        fen="rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+        move_played_san="e4",
+        move_played_uci="e2e4",
+        best_move_san="d4",
+        best_move_uci="d2d4",
+        eval_swing=-300,
+        eval_after=-200,
+        pv_line="d4 d5",
+        game_result="0-1",
+        hero_color=chess.WHITE,
+    )
+    defaults.update(kwargs)
+    return CrucialMoment(**defaults)
+
+
+_METADATA = {"White": "hero", "Black": "villain", "Date": "2026.01.15",
+             "Event": "Live Chess", "Site": "Chess.com", "Result": "0-1"}
+
+
+class TestGenerateHtmlReport:
+    def test_moment_card_sections(self, tmp_path):
+        moments = [
+            _make_moment(svg_content="<svg></svg>", tactical_alert="Knight <hangs>",
+                         refutation_line="Bxg3+ Kh1", explanation="**Careful**"),
+            _make_moment(moment_type="missed_chance", best_line="Qh5+ Kf8"),
+        ]
+        generate_html_report(moments, _METADATA, output_dir=str(tmp_path))
+        content = (tmp_path / "2026-01-15_hero_vs_villain.html").read_text(encoding="utf-8")
+
+        assert content.count('<div class="moment-card">') == 2
+        assert '<div class="board-svg"><svg></svg></div>' in content
+        assert '<div class="tactical-alert">Knight &lt;hangs&gt;</div>' in content
+        assert 'Engine Best: d4' in content
+        assert 'You Could Have Played: d4' in content
+        assert '<div class="best-line">You could have played: ' in content
+        assert '<p><strong>Careful</strong></p>' in content
+
+    def test_chart_and_pgn_only_with_move_evals(self, tmp_path):
+        generate_html_report([], _METADATA, output_dir=str(tmp_path))
+        content = (tmp_path / "2026-01-15_hero_vs_villain.html").read_text(encoding="utf-8")
+        assert "Evaluation</h2>" not in content
+        assert "annotated-pgn" not in content
+
+        generate_html_report([], _METADATA, output_dir=str(tmp_path),
+                             move_evals=[_make_eval(1, 20), _make_eval(2, -40)])
+        content = (tmp_path / "2026-01-15_hero_vs_villain.html").read_text(encoding="utf-8")
+        assert content.index("Evaluation</h2>") < content.index('<code id="annotated-pgn">')
+        assert "1. e4 {+0.20} e4 {-0.40} 0-1</code>" in content
+
+    def test_links_shared_stylesheet(self, tmp_path):
+        generate_html_report([], _METADATA, output_dir=str(tmp_path))
+        content = (tmp_path / "2026-01-15_hero_vs_villain.html").read_text(encoding="utf-8")
+        assert '<link rel="stylesheet" href="style.css">' in content
+        assert "<style>" not in content
+        assert ".moment-card" in (tmp_path / "style.css").read_text(encoding="utf-8")
+
+    def test_rewrites_stale_stylesheet(self, tmp_path):
+        (tmp_path / "style.css").write_text("body {}", encoding="utf-8")
+        generate_html_report([], _METADATA, output_dir=str(tmp_path))
+        assert ".moment-card" in (tmp_path / "style.css").read_text(encoding="utf-8")
+
+
+class TestCountMoments:
+    def test_counts_blunders_and_missed(self):
+        moments = [
+            _make_moment(),
+            _make_moment(moment_type="missed_chance"),
+            _make_moment(moment_type="missed_mate"),
+            _make_moment(),
+        ]
+        assert _count_moments(moments) == (2, 2)
+
+    def test_empty(self):
+        assert _count_moments([]) == (0, 0)
+
+
+def _make_eval(half_move, eval_cp=0, mate_in=None, **kwargs):
+    entry = {"half_move": half_move, "san": "e4", "is_white": half_move % 2 == 1,
+             "eval_cp": eval_cp, "mate_in": mate_in}
+    entry.update(kwargs)
+    return entry
+
+
+class TestGenerateEvalChartSvg:
+    def test_empty(self):
+        assert generate_eval_chart_svg([]) == ""
+
+    def test_points_and_markers(self):
+        evals = [
+            _make_eval(1, 30),
+            _make_eval(2, -2000, moment_type="blunder"),
+            _make_eval(3, 0, mate_in=2, moment_type="missed_mate"),
+        ]
+        svg = generate_eval_chart_svg(evals)
+        polyline = svg.split('<polyline points="')[1].split('"')[0]
+        assert len(polyline.split()) == 3
+        assert svg.count("<circle") == 2
+        assert "Blunder</title>" in svg
+        assert "Missed</title>" in svg
+
+    def test_evals_are_clamped_to_chart(self):
+        svg = generate_eval_chart_svg([_make_eval(1, 5000), _make_eval(2, -5000)], height=300)
+        polyline = svg.split('<polyline points="')[1].split('"')[0]
+        ys = [float(p.split(",")[1]) for p in polyline.split()]
+        assert ys == [20.0, 270.0]
+
+
+class TestRegenerateIndexPage:
+    def test_lists_reports_newest_first(self, tmp_path):
+        generate_html_report([], dict(_METADATA, Date="2026.01.01", White="Zoë"), output_dir=str(tmp_path))
+        generate_html_report([_make_moment()], _METADATA, output_dir=str(tmp_path))
+        (tmp_path / "notes.html").write_text("<html>no metadata</html>", encoding="utf-8")
+
+        regenerate_index_page(str(tmp_path))
+        index = (tmp_path / "index.html").read_text(encoding="utf-8")
+
+        assert index.count('class="report-card"') == 2
+        assert index.index("2026.01.15") < index.index("2026.01.01")
+        assert "Zoë vs villain" in index
+        assert "1 crucial moment<" in index
+
+    def test_metadata_round_trips_quotes_and_ampersands(self, tmp_path):
+        generate_html_report([], dict(_METADATA, White="O'Neil & Co"), output_dir=str(tmp_path))
+        regenerate_index_page(str(tmp_path))
+        index = (tmp_path / "index.html").read_text(encoding="utf-8")
+        assert "O&#x27;Neil &amp; Co vs villain" in index
+
+    def test_unchanged_reports_served_from_cache(self, tmp_path):
+        generate_html_report([], _METADATA, output_dir=str(tmp_path))
+        regenerate_index_page(str(tmp_path))
+        assert (tmp_path / ".index_cache.json").exists()
+
+        with patch("chess_tools.analysis.report._read_report_meta") as mock_read:
+            regenerate_index_page(str(tmp_path))
+            mock_read.assert_not_called()
+        assert "hero vs villain" in (tmp_path / "index.html").read_text(encoding="utf-8")
+
+    def test_modified_report_is_reread(self, tmp_path):
+        generate_html_report([], _METADATA, output_dir=str(tmp_path))
+        regenerate_index_page(str(tmp_path))
+
+        generate_html_report([_make_moment(), _make_moment()], _METADATA, output_dir=str(tmp_path))
+        report = tmp_path / "2026-01-15_hero_vs_villain.html"
+        st = report.stat()
+        os.utime(report, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        regenerate_index_page(str(tmp_path))
+        assert "2 crucial moments" in (tmp_path / "index.html").read_text(encoding="utf-8")
+
+    def test_cache_entry_with_invalid_meta_is_reread(self, tmp_path):
+        generate_html_report([], _METADATA, output_dir=str(tmp_path))
+        regenerate_index_page(str(tmp_path))
+
+        cache_file = tmp_path / ".index_cache.json"
+        cache = json.loads(cache_file.read_text(encoding="utf-8"))
+        for entry in cache.values():
+            entry["meta"] = "not a dict"
+        cache_file.write_text(json.dumps(cache), encoding="utf-8")
+
+        regenerate_index_page(str(tmp_path))
+        assert "hero vs villain" in (tmp_path / "index.html").read_text(encoding="utf-8")
+        assert all(isinstance(e["meta"], dict)
+                   for e in json.loads(cache_file.read_text(encoding="utf-8")).values())
+
+    def test_skips_report_with_corrupt_metadata(self, tmp_path, caplog):
+        generate_html_report([], _METADATA, output_dir=str(tmp_path))
+        (tmp_path / "broken.html").write_text("<meta name=\"report-data\" content='{not json'>",
+                                              encoding="utf-8")
+        regenerate_index_page(str(tmp_path))
+        index = (tmp_path / "index.html").read_text(encoding="utf-8")
+        assert index.count('class="report-card"') == 1
+        assert "Could not read metadata from broken.html" in caplog.text
+
+    def test_skips_report_with_non_object_metadata(self, tmp_path, caplog):
+        generate_html_report([], _METADATA, output_dir=str(tmp_path))
+        (tmp_path / "list.html").write_text("<meta name=\"report-data\" content='[1,2]'>",
+                                            encoding="utf-8")
+        regenerate_index_page(str(tmp_path))
+        index = (tmp_path / "index.html").read_text(encoding="utf-8")
+        assert index.count('class="report-card"') == 1
+        assert "Could not read metadata from list.html" in caplog.text
+
+    def test_reads_legacy_fully_escaped_metadata(self, tmp_path):
+        (tmp_path / "old.html").write_text(
+            "<meta name=\"report-data\" content='{&quot;date&quot;: &quot;2025.01.01&quot;, "
+            "&quot;white&quot;: &quot;a&quot;, &quot;black&quot;: &quot;b&quot;, "
+            "&quot;result&quot;: &quot;1-0&quot;, &quot;moment_count&quot;: 2}'>",
+            encoding="utf-8")
+        regenerate_index_page(str(tmp_path))
+        index = (tmp_path / "index.html").read_text(encoding="utf-8")
+        assert "a vs b" in index
+        assert "2 crucial moments" in index
+
+
+class TestSafeName:
+    def test_strips_punctuation_and_underscores_spaces(self):
+        assert _safe_name("Magnus C. (NOR)") == "Magnus_C_NOR"
+
+    def test_keeps_unicode_letters(self):
+        assert _safe_name("Zoë_Ñ") == "Zoë_Ñ"
+
+
+class TestGenerateAnnotatedPgn:
+    def test_empty(self):
+        assert generate_annotated_pgn(_METADATA, [], []) == ""
+
+    def test_wraps_movetext_at_80_columns(self):
+        evals = [_make_eval(hm, eval_cp=hm * 10) for hm in range(1, 81)]
+        pgn = generate_annotated_pgn(_METADATA, evals, [])
+        headers, movetext = pgn.split("\n\n", 1)
+        assert '[White "hero"]' in headers
+        lines = movetext.split("\n")
+        assert len(lines) > 1
+        assert all(len(line) <= 80 for line in lines)
+        assert " ".join(lines).startswith("1. e4 {+0.10} e4 {+0.20} 2. e4")
+        assert lines[-1].endswith("0-1")
+
+    def test_moment_annotations(self):
+        moments = [_make_moment(tactic_type="fork", refutation_line="Nxe5 d6"),
+                   _make_moment(moment_type="missed_mate", mate_in=2, best_move_san="Qh7+")]
+        evals = [_make_eval(1, moment_index=0), _make_eval(2, mate_in=-3, moment_index=1)]
+        pgn = generate_annotated_pgn(_METADATA, evals, moments)
+        assert "1. e4 $4 {+0.00 Fork · Nxe5}" in pgn
+        assert "e4 $4 {#-3 Missed Mate in 2 · best: Qh7+}" in pgn
+
+
+class TestMdToHtml:
+    def test_block_elements_do_not_get_line_breaks(self):
+        result = _md_to_html("## Plan\n- **one**\n- *two*\nafter\nend")
+        assert result == ("<h3>Plan</h3>\n<ul><li><strong>one</strong></li>\n"
+                          "<li><em>two</em></li>\n</ul>after<br>\nend")
+
+
+class TestFastEscape:
+    def test_plain_text_returned_as_is(self):
+        fen = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+        assert _fast_escape(fen) is fen
+
+    def test_matches_html_escape_when_needed(self):
+        import html
+        for text in ["a<b", "x & y", 'say "hi"', "it's", "1 > 0"]:
+            assert _fast_escape(text) == html.escape(text)